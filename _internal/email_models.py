@@ -1,9 +1,157 @@
-from typing import List, Optional
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, field_validator, model_validator
-from _internal.helpers import CommitInfo
+from _internal.helpers import CommitInfo, merge_sorted_unique
 
 
-class EmailMessage(BaseModel):
+# Small scalar list fields kept sorted and unique, so merge_from can
+# zipper-merge them without hashing.
+MERGE_SORTED_FIELDS = (
+    "repos",
+    "tickets",
+    "tags",
+    "linked_prs",
+    "contributors",
+)
+
+# Remaining list fields; unioned as sets during merging and sorted
+# once by materialize_lists().
+MERGE_SET_FIELDS = (
+    "commits",
+    "files_modified",
+    "linked_tickets",
+)
+
+
+# Fields merge_from folds into an existing email; identity fields
+# (sender, date, subject, message_id, pr_title) are kept as-is; pr_numbers
+# only grows by the PRs append_by_pr registers against the email.
+MERGED_FIELDS = (
+    "repos",
+    "tickets",
+    "body",
+    "markdown",
+    "commits",
+    "files_modified",
+    "tags",
+    "linked_prs",
+    "linked_tickets",
+    "contributors",
+)
+
+
+class PRMergeMixin:
+    """
+    PR-based merging shared by EmailMessage and EmailRecord.
+    """
+
+    __slots__ = ()
+
+    def append_by_pr(
+        self,
+        result: Optional[List["PRMergeMixin"]] = None,
+        index: Optional[Dict[int, "PRMergeMixin"]] = None,
+    ) -> List["PRMergeMixin"]:
+        """
+        results: List of emails of the same type as self
+        index: Dict[int, email] mapping pr_number → merged email in results
+        look up every pr_number of this email in index
+        if found, merge into the existing email (see merge_from)
+        any pr_number not seen yet is registered against the merged email
+        and added to its pr_numbers, so lookups by that PR still find it
+        if no pr_number is found, append this email to results and register it
+        """
+        if result is None:
+            result = []
+        if index is None:
+            index = {}
+
+        pr_numbers = self.pr_numbers or []
+
+        merged_into = []
+        for pr in pr_numbers:
+            existing_email = index.get(pr)
+            if existing_email is not None and not any(existing_email is m for m in merged_into):
+                existing_email.merge_from(self)
+                merged_into.append(existing_email)
+
+        if not merged_into:
+            result.append(self)
+            for pr in pr_numbers:
+                index[pr] = self
+            return result
+
+        target = merged_into[0]
+        new_prs = [pr for pr in pr_numbers if pr not in index]
+        if new_prs:
+            for pr in new_prs:
+                index[pr] = target
+            target.pr_numbers = sorted({*(target.pr_numbers or ()), *new_prs})
+        return result
+
+    def merge_from(self, other: "PRMergeMixin") -> None:
+        """
+        Merge all the fields of other into self except body and sender and date.
+        MERGE_SORTED_FIELDS are expected sorted and unique and are zipper-merged;
+        other list fields are unioned and kept as a set until
+        materialize_lists() is called; any other field that is None on self
+        is updated with the new value.
+        markdown is merged by appending the lists inside dictionary,
+        skipping sonar related markdown.
+        body is merged by appending the bodies with two new lines; the parts
+        are collected in a list and joined once by materialize_lists().
+        """
+        for field in MERGED_FIELDS:
+            existing_value = getattr(self, field)
+            new_value = getattr(other, field)
+
+            if field == "body":
+                # Avoid re-copying the growing body on every merge
+                if new_value:
+                    new_parts = new_value if isinstance(new_value, list) else [new_value]
+                    if isinstance(existing_value, list):
+                        existing_value.extend(new_parts)
+                    else:
+                        setattr(self, field, [existing_value, *new_parts])
+            elif field in MERGE_SORTED_FIELDS and isinstance(existing_value, list):
+                if new_value:
+                    setattr(self, field, merge_sorted_unique(existing_value, new_value))
+            elif isinstance(existing_value, set):
+                if new_value:
+                    existing_value |= set(new_value)
+            elif isinstance(existing_value, list):
+                if new_value:
+                    setattr(self, field, set(existing_value) | set(new_value))
+            else:
+                if existing_value is None and new_value is not None:
+                    setattr(self, field, new_value)
+                elif field == "markdown":
+                    if existing_value and new_value:
+                        for key, items in new_value.items():
+                            if key in existing_value and items:
+                                if existing_value[key]:
+                                    if 'sonar' not in key.lower() or 'sonar' not in ",".join(items).lower():
+                                        existing_value[key].extend(items)
+                            else:
+                                existing_value[key] = items
+                        setattr(self, field, existing_value)
+
+    def materialize_lists(self) -> "PRMergeMixin":
+        """
+        Convert list-valued fields held as sets during merging back into
+        sorted lists, and join collected body parts. Call once after all
+        append_by_pr merges are done.
+        """
+        for field in MERGE_SET_FIELDS:
+            value = getattr(self, field)
+            if isinstance(value, set):
+                setattr(self, field, sorted(value))
+        if isinstance(self.body, list):
+            self.body = "\n\n".join(self.body)
+        return self
+
+
+class EmailMessage(PRMergeMixin, BaseModel):
     """
     Strictly validated Pydantic v2 email object for your GitHub Notification Index Engine.
     """
@@ -91,60 +239,7 @@ class EmailMessage(BaseModel):
         if isinstance(self.pr_title, str) and self.pr_title.strip() == "":
             self.pr_title = None
         return self
-    
-    def append_by_pr(self, result=[]) -> List:
-        """
-        results: List[EmailMessage]
-        email_msg: EmailMessage
-        get pr_number from email_msg
-        check if result contains email with same pr_number
-        if yes, merge the two email messages( merge all the fields excpet body and sender and date, any field that is not a list, if existing field is None, update it with new field)
-        markdown is merged by appending the lists inside dictionary
-        skip sonar related markdown merging
-        body is merged by appending the bodies with two new lines
-        if no, append email_msg to results
-        """
-        pr_numbers = self.pr_numbers or []
-        if result == []:
-            result.append(self)
-            return result
 
-        for pr in pr_numbers:
-            found = False
-            for existing_email in result:
-                if existing_email.pr_numbers and pr in existing_email.pr_numbers:
-                    # Merge fields
-                    for field in self.model_fields_set - {'sender', 'date', 'subject', 'message_id', 'pr_title', 'pr_numbers'}:
-                        existing_value = getattr(existing_email, field)
-                        new_value = getattr(self, field)
-
-                        if isinstance(existing_value, list):
-                            if new_value:
-                                combined = set(existing_value) | set(new_value)
-                                setattr(existing_email, field, list(combined))
-                        else:
-                            if existing_value is None and new_value is not None:
-                                setattr(existing_email, field, new_value)
-                            elif field == "markdown":
-                                if existing_value and new_value:
-                                    for key, items in new_value.items():
-                                        if key in existing_value and items:
-                                            if existing_value[key]:
-                                                if 'sonar' not in key.lower() or 'sonar' not in ",".join(items).lower():
-                                                    existing_value[key].extend(items)
-                                        else:
-                                            existing_value[key] = items
-                                    setattr(existing_email, field, existing_value)
-                            elif field == "body":
-                                # Append bodies
-                                if new_value:
-                                    combined_body = "\n\n".join([existing_value, new_value])
-                                    setattr(existing_email, field, combined_body)
-                    found = True
-                    break
-            if not found:
-                result.append(self)
-        return result
     # ============================================================
     # EMBEDDING TEXT BUILDER
     # ============================================================
@@ -155,47 +250,112 @@ class EmailMessage(BaseModel):
         Includes PR title, repos, PR numbers, tickets, markdown, commits,
         files modified, and the raw body.
         """
-        parts = []
+        # Every section is streamed into one chunk list followed by a
+        # "\n\n" separator; the body closes it and a single join builds the text.
+        out = []
+        add = out.append
+        sep = "\n\n"
 
         if self.tags:
-            parts.append(f"Tags: {', '.join(self.tags)}")
+            add("Tags: ")
+            add(", ".join(self.tags))
+            add(sep)
 
         if self.pr_title:
-            parts.append(f"Title: {self.pr_title}")
+            add("Title: ")
+            add(self.pr_title)
+            add(sep)
 
         if self.pr_numbers:
-            parts.append(f"PR Numbers: {', '.join(map(str, list(set(self.pr_numbers))))}")
+            add("PR Numbers: ")
+            add(", ".join(map(str, set(self.pr_numbers))))
+            add(sep)
 
         if self.repos:
-            parts.append(f"Repos: {', '.join(self.repos)}")
+            add("Repos: ")
+            add(", ".join(self.repos))
+            add(sep)
 
         if self.tickets:
-            parts.append(f"Tickets: {', '.join(self.tickets)}")
+            add("Tickets: ")
+            add(", ".join(self.tickets))
+            add(sep)
 
         if self.markdown:
-            md_parts = []
+            header_added = False
             for section, items in self.markdown.items():
                 if items:
-                    md_parts.append(f"## {section}")
-                    md_parts.extend(f"- {i}" for i in items)
-            if md_parts:
-                parts.append("Markdown Sections:\n" + "\n".join(md_parts))
+                    add("## " if header_added else "Markdown Sections:\n## ")
+                    header_added = True
+                    add(section)
+                    # Items are not all strings: headings are (heading, lines)
+                    out.extend(f"\n- {i}" for i in items)
+                    add("\n")
+            if header_added:
+                # Swap the trailing newline of the last item for the separator
+                out[-1] = sep
 
         if self.commits:
-            parts.append("\n".join(f"{short},{message}" for sha, short, message in self.commits))
+            out.extend(f"{short},{message}\n" for sha, short, message in self.commits)
+            out[-1] = out[-1][:-1]
+            add(sep)
 
         if self.files_modified:
-            parts.append("\n".join(self.files_modified))
+            for path in self.files_modified:
+                add(path)
+                add("\n")
+            out[-1] = sep
 
         if self.linked_prs:
-            parts.append(f"Linked PRs: {', '.join(map(str, self.linked_prs))}")
+            add("Linked PRs: ")
+            add(", ".join(map(str, self.linked_prs)))
+            add(sep)
 
         if self.linked_tickets:
-            parts.append(f"Linked Tickets: {', '.join(self.linked_tickets)}")
+            add("Linked Tickets: ")
+            add(", ".join(self.linked_tickets))
+            add(sep)
 
         if self.contributors:
-            parts.append(f"Contributors: {', '.join(self.contributors)}")
+            add("Contributors: ")
+            add(", ".join(self.contributors))
+            add(sep)
+
+        add(self.body)
+
+        return "".join(out)
 
-        parts.append(self.body)
 
-        return "\n\n".join(parts)
+@dataclass(slots=True)
+class EmailRecord(PRMergeMixin):
+    """
+    Slotted mirror of EmailMessage used inside the extraction pipeline.
+    Records are merged with append_by_pr and converted with to_message()
+    once extraction is done.
+    """
+
+    subject: str
+    body: str
+    sender: Optional[str] = None
+    date: Optional[str] = None
+    message_id: Optional[str] = None
+
+    pr_numbers: Optional[List[int]] = None
+    pr_title: Optional[str] = None
+    repos: Optional[List[str]] = None
+    tickets: Optional[List[str]] = None
+
+    markdown: Optional[dict] = None
+    commits: Optional[List[CommitInfo]] = None
+    files_modified: Optional[List[str]] = None
+
+    tags: Optional[List[str]] = None
+    linked_prs: Optional[List[int]] = None
+    linked_tickets: Optional[List[str]] = None
+    contributors: Optional[List[str]] = None
+
+    def to_message(self) -> EmailMessage:
+        """Build the public EmailMessage without re-running validation."""
+        return EmailMessage.model_construct(
+            **{f.name: getattr(self, f.name) for f in fields(self)}
+        )
@@ -0,0 +1,114 @@
+# embeddings.py
+"""
+Embedding model loading shared by build_index.py and query_llm.py.
+
+Both sides must encode with the same model, so the name lives here.
+The device is picked once: CUDA, then Apple MPS, then CPU. CUDA runs the
+model in fp16; encode() then returns float16 arrays, which callers cast
+to float32 before handing them to FAISS. On CPU the
+int8-quantized ONNX export shipped with the model is used when
+sentence-transformers' ONNX backend (optimum + onnxruntime) is installed.
+
+torch and sentence-transformers are imported inside the functions that
+use them: query_llm.py imports EMBED_MODEL in every mode, and PR / commit
+lookups should not pay seconds of import time for an encoder they skip.
+"""
+
+import platform
+import sys
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+EMBED_MODEL = "all-MiniLM-L6-v2"
+
+# GPUs stay underutilized at small batches; CPU gains little past 64.
+GPU_BATCH_SIZE = 128
+CPU_BATCH_SIZE = 64
+
+
+def select_device() -> str:
+    """Best available torch device name."""
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def onnx_int8_file() -> str:
+    """Quantized ONNX file in the model repo matching this CPU's int8 kernels."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    # The x86 export is unsigned int8 (quint8), unlike the arm64 one
+    return "onnx/model_quint8_avx2.onnx"
+
+
+def load_embedding_model(device: Optional[str] = None) -> "SentenceTransformer":
+    """Load EMBED_MODEL on device (autoselected when None)."""
+    from sentence_transformers import SentenceTransformer
+
+    device = device or select_device()
+    if device == "cpu":
+        try:
+            return SentenceTransformer(
+                EMBED_MODEL,
+                device=device,
+                backend="onnx",
+                model_kwargs={"file_name": onnx_int8_file()},
+            )
+        except Exception as e:
+            # Usually optimum / onnxruntime not installed
+            print(f"⚠️ int8 ONNX encoder unavailable, using PyTorch on CPU: {e}", file=sys.stderr)
+    model = SentenceTransformer(EMBED_MODEL, device=device)
+    if device == "cuda":
+        # Half precision halves memory traffic; cosine drift is negligible
+        model.half()
+    return model
+
+
+def encode_batch_size(model: "SentenceTransformer") -> int:
+    """Batch size suited to the device the model runs on."""
+    return CPU_BATCH_SIZE if model.device.type == "cpu" else GPU_BATCH_SIZE
+
+
+def start_encode_pool(model: "SentenceTransformer"):
+    """
+    Start one model replica per GPU when more than one is visible, else None.
+    A single device gains nothing from replicas: torch already uses every
+    CPU core inside one encode() call.
+    """
+    import torch
+
+    if torch.cuda.device_count() < 2:
+        return None
+    return model.start_multi_process_pool()
+
+
+def compile_model(model: "SentenceTransformer") -> "SentenceTransformer":
+    """
+    torch.compile the transformer of a single-GPU CUDA model; the warm-up
+    encode pays the compile cost once. Other devices, and models that fail
+    to compile, keep the eager module. With several GPUs start_encode_pool
+    pickles the model into worker processes, so it is left uncompiled.
+    """
+    import torch
+
+    if model.device.type != "cuda" or not hasattr(torch, "compile"):
+        return model
+    if torch.cuda.device_count() > 1:
+        return model
+
+    transformer = model[0]
+    eager = transformer.auto_model
+    # dynamic=True: batches are padded to varying lengths, which would
+    # otherwise trigger a recompile per sequence length.
+    transformer.auto_model = torch.compile(eager, dynamic=True)
+    try:
+        model.encode(["warmup", "warmup"])
+    except Exception:
+        transformer.auto_model = eager
+    return model
@@ -2,99 +2,203 @@
 #                 EMAIL EXTRACTION (OPTIMIZED)
 # ============================================================
 
-from typing import List
-from _internal.email_models import EmailMessage
-from _internal.markdown_sections import extract_heading_sections_with_content, extract_markdown_sections
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional
+from _internal.email_models import EmailMessage, EmailRecord
+from _internal.extraction_cache import ExtractionCache
+from _internal.mbox_reader import MboxReader, Span
+from _internal.markdown_sections import extract_markdown_sections
 from _internal.helpers import (
     extract_metadata_from_subject,
-    extract_commits,
-    extract_files_modified,
+    extract_commits_and_files,
     extract_body,
     extract_pr_from_message_id,
 )
-import mailbox
+from email import policy
+from email.parser import BytesParser
 from _internal.tag_classifier import classify_tags
 from _internal.tags_from_file import classify_tags_from_files
+
+
+def _sorted_unique(values):
+    """Sorted, de-duplicated copy (or None), as merge_from expects."""
+    return sorted(set(values)) if values else None
+
+
+def _extract_records(
+    reader: MboxReader,
+    spans: List[Span],
+    cache: Optional[ExtractionCache] = None,
+) -> List[EmailRecord]:
+    """
+    Parse the given message spans into unmerged EmailRecords, in order.
+    Messages whose Message-ID is in cache are loaded instead of extracted.
+    """
+    # Pre-bind functions for speed
+    _extract_body = extract_body
+    _extract_md = extract_markdown_sections
+    _extract_meta = extract_metadata_from_subject
+    _extract_commits_and_files = extract_commits_and_files
+    _extract_pr_from_msgid = extract_pr_from_message_id
+    _classify_tags = classify_tags
+    _classify_tags_from_files = classify_tags_from_files
+
+    Record = EmailRecord
+
+    # Parse raw bytes directly: iterating mailbox.mbox builds an
+    # mboxMessage per entry, which parses and then copies every message.
+    _parse = BytesParser(policy=policy.compat32).parsebytes
+    _read = reader.read
+
+    records = []
+    fresh = []
+
+    for span in spans:
+        msg = _parse(_read(span))
+        message_id = msg.get("Message-ID", "") or ""
+
+        if cache is not None:
+            cached = cache.get(message_id)
+            if cached is not None:
+                records.append(cached)
+                continue
+
+        subject = msg.get("subject", "")
+        sender = msg.get("from", "")
+        date = msg.get("date", "")
+
+        body = _extract_body(msg)
+        meta = _extract_meta(subject)
+
+        # -----------------------------
+        #  PR NUMBERS (Fix: must be int)
+        # -----------------------------
+        pr_subject_list = meta["pr_numbers"]
+        # PR via Message-ID
+        pr_from_msgid = _extract_pr_from_msgid(message_id)
+
+        # Final PR list
+        pr_set = {int(p) for p in pr_subject_list or ()}
+        if pr_from_msgid:
+            pr_set.add(pr_from_msgid)
+        pr_numbers = sorted(pr_set) or None
+
+        commits, file_paths = _extract_commits_and_files(body)
+        file_paths = file_paths or []
+        # Store path components so queries naming a file or folder match;
+        # tagging uses the full paths so directory rules like "/ui/" apply
+        files_modified = sorted({p for path in file_paths for p in path.split("/")}) or None
+        markdown_sections = _extract_md(body)
+        sections = markdown_sections["headings"]
+
+        # Title and section lines are classified in one pass; "," keeps
+        # rules like "sql injection" from matching across the two sources.
+        classification_text = ",".join(
+            [meta["pr_title"] or "", *(",".join(s[1]) for s in sections)]
+        )
+        tags_from_text = _classify_tags(classification_text)
+        tags_from_files = _classify_tags_from_files(file_paths)
+
+        combined_tags = sorted(set(tags_from_text) | set(tags_from_files))
+
+        # Records skip EmailMessage validation, so the two validator
+        # normalizations are applied inline.
+        pr_title = meta["pr_title"]
+        if pr_title is not None and not pr_title.strip():
+            pr_title = None
+
+        # -----------------------------
+        #  Build EmailRecord object
+        # -----------------------------
+        record = Record(
+                subject=subject,
+                date=date,
+
+                message_id=message_id,     # NEW FIELD
+                pr_numbers=pr_numbers,
+
+                repos=_sorted_unique(meta["repos"]),
+                tickets=_sorted_unique(meta["tickets"]),
+                pr_title=pr_title,
+                contributors=_sorted_unique(meta["contributors"]),
+                tags=combined_tags or None,
+
+                body=body,
+                markdown= markdown_sections,
+
+                commits=commits,
+                files_modified=files_modified,
+            )
+        records.append(record)
+        fresh.append((message_id, record))
+
+    if cache is not None:
+        cache.put_many(fresh)
+
+    return records
+
+
+def _extract_chunk(mbox_path: str, spans: List[Span], cache_path: Optional[str]) -> List[EmailRecord]:
+    """
+    Worker entrypoint: mmap and sqlite handles don't pickle, so reopen by
+    path. Spans come from the parent's scan, so the file isn't rescanned.
+    """
+    reader = MboxReader(mbox_path)
+    cache = ExtractionCache(cache_path) if cache_path else None
+    try:
+        return _extract_records(reader, spans, cache)
+    finally:
+        reader.close()
+        if cache is not None:
+            cache.close()
+
+
 class EmailExtractor:
+    def __init__(self, workers: int = 1, chunk_size: int = 500, cache_path: Optional[str] = None):
+        """
+        workers: processes used to parse messages of a single mbox
+        chunk_size: most messages handed to a worker at a time; mboxes no
+            larger than this are parsed serially
+        cache_path: sqlite file caching per-message results by Message-ID
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache_path = cache_path
+
     def extract_emails_from_mbox(self, mbox_path: str) -> List[EmailMessage]:
         """Fast, allocation-optimized mbox → EmailMessage parser."""
 
         print(f"📦 Parsing: {mbox_path}")
 
-        mbox = mailbox.mbox(mbox_path)
-
-        # Pre-bind functions for speed
-        _extract_body = extract_body
-        _extract_md = extract_markdown_sections
-        _extract_meta = extract_metadata_from_subject
-        _extract_commits = extract_commits
-        _extract_files = extract_files_modified
-        _extract_pr_from_msgid = extract_pr_from_message_id
-        _classify_tags = classify_tags
-        _classify_tags_from_files = classify_tags_from_files
-
-        EmailMsg = EmailMessage
+        reader = MboxReader(mbox_path)
+        try:
+            spans = reader.spans()
+            if self.workers > 1 and len(spans) > self.chunk_size:
+                # Messages parse independently; shard spans across processes
+                # and keep chunk order so merged bodies match a serial run.
+                # Chunks shrink below chunk_size so every worker gets one.
+                size = min(self.chunk_size, -(-len(spans) // self.workers))
+                chunks = [spans[i:i + size] for i in range(0, len(spans), size)]
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    batches = list(executor.map(
+                        _extract_chunk, repeat(mbox_path), chunks, repeat(self.cache_path)
+                    ))
+            else:
+                cache = ExtractionCache(self.cache_path) if self.cache_path else None
+                try:
+                    batches = [_extract_records(reader, spans, cache)]
+                finally:
+                    if cache is not None:
+                        cache.close()
+        finally:
+            reader.close()
 
         results = []
+        pr_index = {}
+        for batch in batches:
+            for record in batch:
+                record.append_by_pr(result=results, index=pr_index)
 
-        for msg in mbox:
-            subject = msg.get("subject", "")
-            sender = msg.get("from", "")
-            date = msg.get("date", "")
-            message_id = msg.get("Message-ID", "") or ""
-
-            body = _extract_body(msg)
-            meta = _extract_meta(subject)
-
-            # -----------------------------
-            #  PR NUMBERS (Fix: must be int)
-            # -----------------------------
-            pr_subject_list = meta["pr_numbers"]
-            # PR via Message-ID
-            pr_from_msgid = _extract_pr_from_msgid(message_id)
-
-            # Final PR list
-            pr_numbers = pr_subject_list or []
-            if pr_from_msgid and pr_from_msgid not in pr_numbers:
-                pr_numbers.append(pr_from_msgid)
-            pr_numbers = [int(p) for p in pr_numbers] if pr_numbers else None
-            pr_numbers = list(set(pr_numbers)) if pr_numbers else None
-
-            files_modified = _extract_files(body) or []
-            # Further split paths into components for finer tagging
-            flat_parts = [p for path in files_modified for p in path.split("/")]
-            files_modified = list(set(flat_parts)) if files_modified else None
-            markdown_sections = _extract_md(body)
-            sections = extract_heading_sections_with_content(body)
-
-            tags_from_title = _classify_tags(meta["pr_title"])
-            tags_from_files = _classify_tags_from_files(files_modified or [])
-            tags_from_section = _classify_tags(','.join(','.join(s[1]) for s in sections))
-
-            combined_tags = sorted(set(tags_from_title) | set(tags_from_files) | set(tags_from_section))
-            #if  pr_numbers is not None:
-            #    print(sections[0], sections[1], pr_numbers)
-            # -----------------------------
-            #  Build EmailMessage object
-            # -----------------------------
-            EmailMsg(
-                    subject=subject,
-                    date=date,
-
-                    message_id=message_id,     # NEW FIELD
-                    pr_numbers=pr_numbers or None,
-
-                    repos=meta["repos"],
-                    tickets=meta["tickets"],
-                    pr_title=meta["pr_title"],
-                    contributors=meta["contributors"],
-                    tags=combined_tags,
-
-                    body=body,
-                    markdown= markdown_sections,
-
-                    commits=_extract_commits(body),
-                    files_modified=files_modified,
-                ).append_by_pr(result=results)
-
-        return results
+        # Convert merged records to EmailMessage at the API boundary
+        return [record.materialize_lists().to_message() for record in results]
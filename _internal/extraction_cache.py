@@ -0,0 +1,85 @@
+# extraction_cache.py
+"""
+On-disk cache of per-message extraction results, keyed by Message-ID.
+
+Re-running the indexer over an updated mbox only needs to extract the
+messages that were not seen before; everything else is loaded from here.
+Backed by sqlite3 so several extractor processes can share one file.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+from typing import List, Optional, Tuple
+
+from _internal.email_models import EmailRecord
+
+# Bump to drop cached records for reasons the sources below don't capture
+# (e.g. a dependency upgrade changing parsed output).
+CACHE_VERSION = 1
+
+# Modules whose code determines an EmailRecord's contents
+EXTRACTION_MODULES = (
+    "email_models.py",
+    "extract_emails_from_mbox.py",
+    "helpers.py",
+    "markdown_sections.py",
+    "tag_classifier.py",
+    "tags_from_file.py",
+)
+
+
+def extraction_version() -> str:
+    """
+    CACHE_VERSION plus a digest of the extraction sources, so any change
+    to how records are built invalidates the cache without a manual bump.
+    """
+    digest = hashlib.blake2b(str(CACHE_VERSION).encode(), digest_size=16)
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in EXTRACTION_MODULES:
+        with open(os.path.join(base, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " message_id TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " record BLOB NOT NULL,"
+            " PRIMARY KEY (message_id, version))"
+        )
+        self.version = extraction_version()
+        # Records from other extraction code can never be read again
+        self.conn.execute("DELETE FROM records WHERE version != ?", (self.version,))
+        self.conn.commit()
+
+    def get(self, message_id: str) -> Optional[EmailRecord]:
+        """Return the cached record for message_id, or None on a miss."""
+        if not message_id:
+            return None
+        row = self.conn.execute(
+            "SELECT record FROM records WHERE message_id = ? AND version = ?",
+            (message_id, self.version),
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put_many(self, records: List[Tuple[str, EmailRecord]]) -> None:
+        """Store freshly extracted, not yet merged records."""
+        rows = [
+            (message_id, self.version, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+            for message_id, record in records
+            if message_id
+        ]
+        if rows:
+            self.conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?)", rows)
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
@@ -15,7 +15,8 @@ in GitHub notification email formats.
 """
 
 import re
-from bs4 import BeautifulSoup
+import sys
+from selectolax.lexbor import LexborHTMLParser
 from typing import List, Optional
 
 from collections import namedtuple
@@ -25,25 +26,10 @@ CommitInfo = namedtuple("CommitInfo", ["sha", "short", "message"])
 #                 REGEX DEFINITIONS
 # ============================================================
 
-# PR references in subject lines:
-# Matches formats like:
-#   "PR #8040", "pull request #8040", "#8040"
-PR_FROM_SUBJECT = re.compile(
-    r'(?:PR\s*#|pull request\s*#|#)(\d+)', 
-    re.IGNORECASE
-)
-
-# Repository names appear inside square brackets in subjects:
-#   "[fuzzycert/fuzzycert_codecops]"
-REPO_FROM_SUBJECT = re.compile(r'\[([^\]]+)\]')
-
-# Ticket identifiers such as "FIZZY-2044" or "XY-12345"
-TICKET_FROM_SUBJECT = re.compile(r'\b([A-Z]+-\d+)\b')
-
 # Commit lines in text/plain emails.
 # Matches a SHA (7–40 hex chars) at start of line + optional message text.
 COMMIT_SIMPLE = re.compile(
-    r'^[ \t]*([0-9a-f]{7,40})\b(?:\s+(.+))?',
+    r'^[ \t]*([0-9a-f]{7,40})\b(?:[ \t]+(.+))?',
     re.MULTILINE
 )
 
@@ -54,21 +40,53 @@ COMMIT_SIMPLE = re.compile(
 #   D old/module.c
 #   R100 a/path b/path
 FILE_PATH = re.compile(
-    r'^[ \t]*(?:M|A|D|R\d{1,3})\s+(?:a/|b/)?([A-Za-z0-9_./\-\+]+)',
+    r'^[ \t]*(?:M|A|D|R\d{1,3})[ \t]+(?:a/|b/)?([A-Za-z0-9_./\-\+]+)',
     re.MULTILINE
 )
 
-MENTION_RE = re.compile(r'@([A-Za-z0-9-]+)')
-def extract_contributors(body: str):
-    """
-    Extract GitHub contributor usernames from an email body.
-    Returns a unique unordered list.
-    """
-    if not body:
-        return []
+# COMMIT_SIMPLE and FILE_PATH fused into one alternation so a body is
+# scanned once for both. The two can't start on the same line: a SHA is
+# lowercase hex, a diff status is an uppercase M/A/D/R. Separators are
+# [ \t]+ so neither match runs on into the next line.
+# Lines are anchored on a literal "\n" rather than ^ with re.MULTILINE:
+# a literal prefix lets the engine skip straight to newlines instead of
+# trying the pattern at every character. Scan "\n" + text so the first
+# line is covered.
+BODY_LINE_RE = re.compile(
+    r'\n[ \t]*(?:'
+    r'(?P<sha>[0-9a-f]{7,40})\b(?:[ \t]+(?P<msg>.+))?'
+    r'|(?:M|A|D|R\d{1,3})[ \t]+(?:a/|b/)?(?P<path>[A-Za-z0-9_./\-\+]+)'
+    r')'
+)
+
+# Trailing "(123)" change counts appended to diff file lines
+TRAILING_COUNT_RE = re.compile(r'\(\d+\)$')
+
+# Subject tokens, scanned in one pass:
+#   repo:    names inside square brackets, "[fuzzycert/fuzzycert_codecops]"
+#   pr:      "PR #8040", "pull request #8040", "#8040"; case variants are
+#            spelled out as character classes rather than using
+#            re.IGNORECASE, which case-folds every character compared
+#   ticket:  "FIZZY-2044", "XY-12345"; also consumes trailing ":- "
+#   mention: "@username"
+SUBJECT_TOKEN_RE = re.compile(
+    r'\[(?P<repo>[^\]]+)\]'
+    r'|(?:[Pp][Rr]\s*#|[Pp][Uu][Ll][Ll] [Rr][Ee][Qq][Uu][Ee][Ss][Tt]\s*#|#)(?P<pr>\d+)'
+    r'|\b(?P<ticket>[A-Z]+-\d+)\b[:\-\s]*'
+    r'|@(?P<mention>[A-Za-z0-9-]+)'
+)
+
+# PR number embedded in GitHub Message-IDs:
+#   "<org/repo/pull/8040/c123@github.com>"
+PR_MSGID_RE = re.compile(r"/pull/(\d+)/")
+
+# PR links inside email bodies:
+#   "https://github.com/org/repo/pull/8040"
+PR_LINK_RE = re.compile(r"https?://github\.com/[^/]+/[^/]+/pull/(\d+)", re.IGNORECASE)
+
+# Ticket identifiers anywhere in a body (allows digits after the first letter)
+TICKET_BODY_RE = re.compile(r"\b([A-Z][A-Z0-9]{1,10}-\d{1,6})\b")
 
-    matches = MENTION_RE.findall(body)
-    return list(set(matches))
 # ============================================================
 #                 EMAIL BODY EXTRACTOR
 # ============================================================
@@ -93,42 +111,64 @@ def extract_body(msg) -> str:
     """
     # If message is not multipart, decode directly
     if not msg.is_multipart():
-        payload = msg.get_payload(decode=True)
-        if isinstance(payload, bytes):
-            return payload.decode(errors='ignore')
-        return str(payload)
+        return _decode_part(msg) or ""
 
-    plain, html = [], []
+    plain, html_parts = [], []
 
     for part in msg.walk():
         ctype = part.get_content_type()
-        payload = part.get_payload(decode=True)
-        if payload is None:
-            continue
-
-        # Decode safely
-        decoded = payload.decode(errors='ignore') if isinstance(payload, bytes) else str(payload)
 
         if ctype == "text/plain":
-            plain.append(decoded)
+            text = _decode_part(part)
+            if text is None:
+                continue
+            plain.append(text)
 
-        elif ctype == "text/html":
-            html.append(clean_html(decoded))
+        elif ctype == "text/html" and not plain:
+            # Defer decoding: HTML is only used when no plain part exists
+            html_parts.append(part)
 
     # Prefer plain text
     if plain:
         return "\n".join(plain)
 
     # Fallback to cleaned HTML
+    html = []
+    for part in html_parts:
+        text = _decode_part(part)
+        if text is None:
+            continue
+        html.append(clean_html(text))
+
     if html:
         return "\n".join(html)
 
     return ""
 
 
+def _decode_part(part) -> Optional[str]:
+    """
+    Decode a part's payload using its declared charset (UTF-8 when absent
+    or unknown). get_payload(decode=True) undoes base64 / quoted-printable.
+    """
+    payload = part.get_payload(decode=True)
+    if payload is None:
+        return None
+    if not isinstance(payload, bytes):
+        return str(payload)
+    charset = part.get_content_charset() or "utf-8"
+    try:
+        return payload.decode(charset, errors='ignore')
+    except LookupError:
+        return payload.decode("utf-8", errors='ignore')
+
+
 def clean_html(html: str) -> str:
     """
-    Convert HTML content into clean plain text using BeautifulSoup.
+    Convert HTML content into clean plain text.
+
+    Uses selectolax (lexbor, C-based). <script> and <style> contents are
+    dropped so tracking code and CSS don't end up in the indexed text.
 
     Parameters:
         html (str): HTML string.
@@ -137,8 +177,10 @@ def clean_html(html: str) -> str:
         str: Extracted plain text. If parsing fails, the raw HTML is returned.
     """
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        return soup.get_text("\n", strip=True)
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(["script", "style"])
+        body = tree.body
+        return body.text(separator="\n", strip=True) if body is not None else ""
     except Exception:
         return html
 
@@ -170,33 +212,46 @@ def extract_metadata_from_subject(subject: str) -> dict:
             "repos": List[str] or None,
             "pr_numbers": List[str] or None,
             "tickets": List[str] or None,
-            "pr_title": str or None
+            "pr_title": str or None,
+            "contributors": List[str] or None
         }
     """
-    repos = REPO_FROM_SUBJECT.findall(subject)
-    pr_numbers = PR_FROM_SUBJECT.findall(subject)
-    tickets = TICKET_FROM_SUBJECT.findall(subject)
-    contributors = extract_contributors(subject)
-
-    # Begin with original subject and remove extracted metadata
-    clean_title = subject
-
-    # Remove repo brackets: [repo/name]
-    for r in repos:
-        clean_title = clean_title.replace(f'[{r}]', '')
-
-    # Remove PR markers: PR #NNNN, pull request #NNNN, or #NNNN
-    for p in pr_numbers:
-        clean_title = re.sub(
-            rf'(PR\s*#|pull request\s*#|#){p}', 
-            '', 
-            clean_title, 
-            flags=re.I
-        )
-
-    # Remove ticket IDs
-    for t in tickets:
-        clean_title = re.sub(rf'\b{t}[:\-\s]*', '', clean_title)
+    repos, pr_numbers, tickets, contributors = [], [], [], []
+    _intern = sys.intern
+
+    # Single scan over the subject: captures go to their kind's list and
+    # the text between repo / PR / ticket tokens becomes the cleaned title.
+    # Mentions are kept in the title. Repos, tickets and usernames repeat
+    # across thousands of emails, so they are interned to share one object.
+    def collect(m):
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "pr":
+            pr_numbers.append(value)
+        elif kind == "ticket":
+            tickets.append(_intern(value))
+        else:
+            if kind == "mention":
+                contributors.append(_intern(value))
+            else:
+                repos.append(_intern(value))
+            # Repo and mention captures are scanned too, so "[ABC-123]" and
+            # "@ABC-123" still yield their ticket as with the separate patterns.
+            for inner in SUBJECT_TOKEN_RE.finditer(value):
+                collect(inner)
+
+    title_parts = []
+    pos = 0
+    for m in SUBJECT_TOKEN_RE.finditer(subject):
+        collect(m)
+        if m.lastgroup == "mention":
+            continue
+        title_parts.append(subject[pos:m.start()])
+        pos = m.end()
+    title_parts.append(subject[pos:])
+
+    clean_title = "".join(title_parts)
+    contributors = list(set(contributors))
 
     return {
         "repos": repos or None,
@@ -220,20 +275,20 @@ def extract_commits(text: str) -> Optional[List[CommitInfo]]:
         • Optional commit message
 
     Output format:
-        ["<sha> <message>", "<sha>", ...]
+        [CommitInfo(sha, short, message), ...]
+        where short is the SHA normalized to its first 7 characters.
 
     Parameters:
         text (str): email body text.
 
     Returns:
-        list[str] or None: commit entries, or None if no commits found.
+        list[CommitInfo] or None: commit entries, or None if no commits found.
     """
     commits = [
-        f"{m.group(1)} {m.group(2) or ''}".strip()
+        CommitInfo(sha=m.group(1), short=m.group(1)[:7], message=(m.group(2) or '').strip())
         for m in COMMIT_SIMPLE.finditer(text)
     ]
-    return parse_commit_lines(commits) or None
- 
+    return commits or None
 
 
 def extract_files_modified(text: str) -> Optional[List[str]]:
@@ -248,25 +303,41 @@ def extract_files_modified(text: str) -> Optional[List[str]]:
 
     Post-processing:
         • Removes trailing "(number)" metadata sometimes found in diff outputs
-        • Deduplicates the list
+        • Deduplicates the list, keeping full paths
 
     Parameters:
         text (str): email body text.
 
     Returns:
-        list[str] or None: modified file paths, or None if none found.
+        list[str] or None: sorted modified file paths, or None if none found.
     """
-    raw_matches = FILE_PATH.findall(text)
+    paths = {
+        TRAILING_COUNT_RE.sub('', m).strip()
+        for m in FILE_PATH.findall(text)
+    }
+    paths.discard('')
+    return sorted(paths) or None
 
-    cleaned = [
-        re.sub(r'\(\d+\)$', '', m).strip()
-        for m in raw_matches
-    ]
+def extract_commits_and_files(text: str):
+    """
+    Single-pass equivalent of extract_commits() and extract_files_modified().
 
-    flat_parts = [p for path in cleaned for p in path.split("/")]
-    files_modified = list(set(flat_parts)) if flat_parts else []
+    Parameters:
+        text (str): email body text.
 
-    return files_modified
+    Returns:
+        tuple: (list[CommitInfo] or None, list[str] or None)
+    """
+    commits = []
+    paths = set()
+    for m in BODY_LINE_RE.finditer("\n" + text):
+        sha = m.group("sha")
+        if sha is not None:
+            commits.append(CommitInfo(sha=sha, short=sha[:7], message=(m.group("msg") or '').strip()))
+        else:
+            paths.add(TRAILING_COUNT_RE.sub('', m.group("path")).strip())
+    paths.discard('')
+    return commits or None, sorted(paths) or None
 
 def generate_tags_from_pr_title(pr_title: str):
     """
@@ -329,7 +400,6 @@ def generate_tags_from_pr_title(pr_title: str):
 def extract_pr_from_message_id(msgid: str) -> int | None:
     if not msgid:
         return None
-    PR_MSGID_RE = re.compile(r"/pull/(\d+)/")
     m = PR_MSGID_RE.search(msgid)
     if m:
         return int(m.group(1))
@@ -338,27 +408,53 @@ def extract_pr_from_message_id(msgid: str) -> int | None:
 def extract_prs_from_body_links(body: str) -> list[int]:
     if not body:
         return []
-    PR_LINK_RE = re.compile(r"https?://github\.com/[^/]+/[^/]+/pull/(\d+)", re.IGNORECASE)
     matches = PR_LINK_RE.findall(body)
     return [int(m) for m in matches]
 
 def extract_tickets_from_body(body: str) -> list[str]:
     if not body:
         return []
-    TICKET_BODY_RE = re.compile(r"\b([A-Z][A-Z0-9]{1,10}-\d{1,6})\b")
     return TICKET_BODY_RE.findall(body)
 
 
+# ============================================================
+#           SORTED LIST HELPERS
+# ============================================================
+
+def merge_sorted_unique(a: List, b: List) -> List:
+    """
+    Merge two ascending, duplicate-free lists into a new ascending,
+    duplicate-free list.
 
-def parse_commit_lines(raw_commits: List[str]) -> List[CommitInfo]:
-    commits = []
-    for line in raw_commits:
-        sha, msg = line.split(" ", 1)
-        commits.append(
-            CommitInfo(
-                sha=sha,
-                short=sha[:7],
-                message=msg.strip()
-            )
-        )
-    return commits
+    Fast paths:
+        • either side empty → copy of the other
+        • disjoint ranges   → plain concatenation
+    Otherwise a single zipper pass; no hashing of elements.
+    """
+    if not a:
+        return list(b)
+    if not b:
+        return list(a)
+    if a[-1] < b[0]:
+        return a + b
+    if b[-1] < a[0]:
+        return b + a
+
+    merged = []
+    i, j = 0, 0
+    len_a, len_b = len(a), len(b)
+    while i < len_a and j < len_b:
+        x, y = a[i], b[j]
+        if x < y:
+            merged.append(x)
+            i += 1
+        elif y < x:
+            merged.append(y)
+            j += 1
+        else:
+            merged.append(x)
+            i += 1
+            j += 1
+    merged.extend(a[i:])
+    merged.extend(b[j:])
+    return merged
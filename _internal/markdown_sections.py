@@ -11,20 +11,23 @@ FENCED_BLOCK_RE = re.compile(
     re.DOTALL
 )
 
-HEADING_RE = re.compile(
-    r"^(#{1,6})\s+(.*)$",
-    re.MULTILINE
+# GitHub email plain-text headings, optionally followed by "(count)"
+PLAIN_HEADINGS = (
+    r"Commit Summary|File Changes|What changed\?|What changed|Summary|"
+    r"Implementation Details|Implementation|Testing Notes|Changelog|Description"
 )
 
-# NEW: Support GitHub email plain-text headings
-PLAIN_HEADING_RE = re.compile(
-    r"^(Commit Summary|File Changes|What changed\?|What changed|Summary|"
-    r"Implementation Details|Implementation|Testing Notes|Changelog|Description)\s*(?:\(.+\))?$",
-    re.IGNORECASE | re.MULTILINE
+# Markdown "#".."######" headings and PLAIN_HEADINGS (case-insensitive)
+# in one pattern, so each body line is matched once
+SECTION_HEADING_RE = re.compile(
+    r"(?:#{1,6}\s+(?P<md>.*)"
+    rf"|(?i:(?P<plain>{PLAIN_HEADINGS}))\s*(?:\(.+\))?)$"
 )
 
+# Anchored on a literal "\n" instead of ^ so the engine can jump between
+# newlines; scan "\n" + text so the first line is covered.
 LIST_RE = re.compile(
-    r"^[ \t]*([-*+]|\d+\.)\s+.+$",
+    r"\n[ \t]*([-*+]|\d+\.)\s+.+$",
     re.MULTILINE
 )
 
@@ -50,10 +53,11 @@ def extract_heading_sections_with_content(text: str):
             (None, [...])   # text before first heading
         ]
 
-    Uses both markdown (# ## ###) and plain GitHub headings
-    that your enhanced PLAIN_HEADING_RE detects.
+    Uses both markdown (# ## ###) and the plain GitHub headings
+    listed in PLAIN_HEADINGS (see SECTION_HEADING_RE).
     """
 
+    match_heading = SECTION_HEADING_RE.match
     sections = []
     current_heading = None
     current_lines = []
@@ -64,22 +68,14 @@ def extract_heading_sections_with_content(text: str):
         if not raw.strip():
             continue
 
-        # markdown-style heading
-        m = HEADING_RE.match(raw)
+        # markdown-style or plain-text GitHub heading
+        m = match_heading(raw)
         if m:
             # save previous
             if current_heading is not None or current_lines:
                 sections.append((current_heading, current_lines))
-            current_heading = m.group(2).strip()
-            current_lines = []
-            continue
-
-        # plain-text GitHub heading
-        m2 = PLAIN_HEADING_RE.match(raw)
-        if m2:
-            if current_heading is not None or current_lines:
-                sections.append((current_heading, current_lines))
-            current_heading = m2.group(1).strip()
+            plain = m.group("plain")
+            current_heading = (m.group("md") if plain is None else plain).strip()
             current_lines = []
             continue
 
@@ -97,14 +93,8 @@ def extract_lists(text: str) -> Optional[List[str]]:
     """
     Extract bullet or numbered list lines from markdown.
     """
-    lines = LIST_RE.findall(text)
-    
-    if not lines:
-        return None
-
-    # Re-run regex to extract full lines (not just bullet symbol)
-    raw_lines = re.findall(LIST_RE.pattern, text, re.MULTILINE)
-    cleaned = [l.strip() for l in raw_lines]
+    # findall would return only the bullet group; take the full matched line
+    cleaned = [m.group(0).strip() for m in LIST_RE.finditer("\n" + text)]
 
     return cleaned or None
 
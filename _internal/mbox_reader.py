@@ -0,0 +1,57 @@
+# mbox_reader.py
+"""
+Read-only mbox access over an mmap.
+
+mailbox.mbox builds its table of contents with a Python readline() loop
+over the whole file, and every extractor worker that reopens the mbox pays
+for that scan again. MboxReader finds the "From " separator lines with a
+single regex pass over the mapped file, using the same split rules as
+mailbox.mbox, and exposes each message as a (start, stop) byte span that
+can be handed to other processes and read without rescanning.
+"""
+
+import mmap
+import re
+from typing import List, Optional, Tuple
+
+FROM_LINE_RE = re.compile(rb"^From ", re.MULTILINE)
+
+Span = Tuple[int, int]
+
+
+class MboxReader:
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            self._data = b""
+        self._spans: Optional[List[Span]] = None
+
+    def spans(self) -> List[Span]:
+        """
+        Byte span of every message, excluding its "From " line. As in
+        mailbox.mbox, a blank line right before the next separator is
+        not part of the message.
+        """
+        if self._spans is None:
+            data = self._data
+            starts = [m.start() for m in FROM_LINE_RE.finditer(data)]
+            ends = starts[1:] + [len(data)]
+            spans = []
+            for start, end in zip(starts, ends):
+                body_start = data.find(b"\n", start, end) + 1 or end
+                stop = end - 1 if data[end - 2:end] == b"\n\n" else end
+                spans.append((body_start, max(body_start, stop)))
+            self._spans = spans
+        return self._spans
+
+    def read(self, span: Span) -> bytes:
+        start, stop = span
+        return self._data[start:stop]
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
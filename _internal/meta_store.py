@@ -0,0 +1,210 @@
+# meta_store.py
+"""
+Columnar storage for the email metadata saved next to the FAISS index.
+
+meta.pkl holds one list per EmailMessage field instead of a list of
+EmailMessage objects: unpickling plain lists skips rebuilding a pydantic
+object per email, and query code can scan a single column (pr_numbers,
+commits) and only materialize the rows it returns. Row i is FAISS id i.
+
+The large fields (COLD_FIELDS) live in a sqlite file beside meta.pkl and
+are read only for materialized rows, so bodies never load wholesale. They
+are pickled and zlib-compressed: templated notification text shrinks
+several-fold, and only a handful of rows are decompressed per query.
+"""
+
+import bisect
+import os
+import pickle
+import sqlite3
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+from _internal.email_models import EmailMessage
+from _internal.helpers import CommitInfo
+
+META_FORMAT_VERSION = 3
+
+# Fields too large to keep in memory for every email at query time
+COLD_FIELDS = ("body", "markdown")
+
+
+def cold_path_for(meta_path: str) -> str:
+    return os.path.splitext(meta_path)[0] + "_cold.sqlite"
+
+
+class MetaStore:
+    def __init__(
+        self,
+        columns: Dict[str, List],
+        cold_path: Optional[str] = None,
+    ):
+        """
+        columns: field name → per-row values
+        cold_path: sqlite file holding COLD_FIELDS; None when columns has them
+        """
+        self.columns = columns
+        self.cold_path = cold_path
+        self._cold = None
+        self._inverted: Dict[str, Dict] = {}
+        self._sorted_keys: Dict[str, List[str]] = {}
+        self._size = len(next(iter(columns.values()), []))
+
+    @classmethod
+    def from_messages(cls, emails: List[EmailMessage]) -> "MetaStore":
+        return cls({
+            name: [getattr(email, name) for email in emails]
+            for name in EmailMessage.model_fields
+        })
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, i: int) -> EmailMessage:
+        return self.rows([i])[0]
+
+    def rows(self, ids: Iterable[int]) -> List[EmailMessage]:
+        """
+        Build the EmailMessages for ids, in order (values were validated at
+        index time). Cold fields are read with batched IN queries, not per row.
+        """
+        ids = [int(i) for i in ids]
+        cold = self._fetch_cold(ids) if self.cold_path else {}
+        return [
+            EmailMessage.model_construct(
+                **{name: column[i] for name, column in self.columns.items()},
+                **cold.get(i, {}),
+            )
+            for i in ids
+        ]
+
+    def column(self, name: str) -> List:
+        return self.columns[name]
+
+    def lookup(self, name: str, value) -> List[int]:
+        """
+        Ascending row ids whose list column name contains value.
+        CommitInfo items match on their full or short SHA, not the message.
+        The inverted index is built on first use with one pass over the
+        column, so later lookups are a dict get instead of a full scan.
+        """
+        return self._inverted_index(name).get(value, [])
+
+    def lookup_prefix(self, name: str, prefix: str) -> List[int]:
+        """
+        Ascending row ids whose list column name holds a string starting
+        with prefix, e.g. a commit SHA abbreviated to any length. Keys are
+        kept sorted, so the matches are one contiguous bisect range.
+        """
+        inverted = self._inverted_index(name)
+        keys = self._sorted_keys.get(name)
+        if keys is None:
+            keys = self._sorted_keys[name] = sorted(k for k in inverted if isinstance(k, str))
+        ids = set()
+        for key in keys[bisect.bisect_left(keys, prefix):]:
+            if not key.startswith(prefix):
+                break
+            ids.update(inverted[key])
+        return sorted(ids)
+
+    def _inverted_index(self, name: str) -> Dict:
+        inverted = self._inverted.get(name)
+        if inverted is None:
+            inverted = self._inverted[name] = _invert(self.columns[name])
+        return inverted
+
+    def _fetch_cold(self, ids: List[int]) -> Dict[int, Dict]:
+        if self._cold is None:
+            self._cold = sqlite3.connect(self.cold_path)
+        unique = list(set(ids))
+        cold = {}
+        # Batched to stay under sqlite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            rows = self._cold.execute(
+                f"SELECT id, {', '.join(COLD_FIELDS)} FROM cold"
+                f" WHERE id IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            for row in rows:
+                cold[row[0]] = {
+                    name: _unpack(value)
+                    for name, value in zip(COLD_FIELDS, row[1:])
+                }
+        return cold
+
+
+def _invert(column: List) -> Dict:
+    inverted: Dict = {}
+    for i, values in enumerate(column):
+        keys = set()
+        for value in values or ():
+            keys.update((value.sha, value.short) if isinstance(value, CommitInfo) else (value,))
+        for key in keys:
+            inverted.setdefault(key, []).append(i)
+    return inverted
+
+
+def _pack(value) -> bytes:
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+
+def _unpack(value: bytes):
+    return pickle.loads(zlib.decompress(value))
+
+
+def save_meta(emails: List[EmailMessage], path: str) -> None:
+    hot = [name for name in EmailMessage.model_fields if name not in COLD_FIELDS]
+    columns = {name: [getattr(email, name) for email in emails] for name in hot}
+
+    cold_path = cold_path_for(path)
+    if os.path.exists(cold_path):
+        os.remove(cold_path)
+    conn = sqlite3.connect(cold_path)
+    try:
+        conn.execute(
+            f"CREATE TABLE cold (id INTEGER PRIMARY KEY, {', '.join(f'{n} BLOB' for n in COLD_FIELDS)})"
+        )
+        conn.executemany(
+            f"INSERT INTO cold VALUES (?{', ?' * len(COLD_FIELDS)})",
+            (
+                (i, *(_pack(getattr(email, name)) for name in COLD_FIELDS))
+                for i, email in enumerate(emails)
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    with open(path, "wb") as f:
+        pickle.dump(
+            {
+                "version": META_FORMAT_VERSION,
+                "columns": columns,
+                "cold": os.path.basename(cold_path),
+            },
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+
+def load_meta(path: str) -> MetaStore:
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    # Indexes built before the columnar format pickled the email list itself
+    if isinstance(data, list):
+        return MetaStore.from_messages(data)
+    version = data.get("version") if isinstance(data, dict) else None
+    if version != META_FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has metadata format {version!r}, expected "
+            f"{META_FORMAT_VERSION}; rebuild the index with build_index.py"
+        )
+    cold_path = os.path.join(os.path.dirname(path), data["cold"])
+    # sqlite3.connect would silently create an empty file in its place
+    if not os.path.exists(cold_path):
+        raise FileNotFoundError(
+            f"{path} keeps email bodies in {cold_path}, which is missing; "
+            "copy it alongside meta.pkl or rebuild the index"
+        )
+    return MetaStore(data["columns"], cold_path)
@@ -0,0 +1,58 @@
+# query_embedding_cache.py
+"""
+On-disk cache of query embeddings, keyed by normalized query text.
+
+query_llm.py runs once per question, so an in-process lru_cache would
+never hit. Repeated questions instead read their vector from a sqlite
+file, which skips both loading the encoder and the forward pass.
+"""
+
+import hashlib
+import sqlite3
+from typing import Dict, List
+
+import numpy as np
+
+from _internal.embeddings import EMBED_MODEL
+
+
+def normalize_query(query: str) -> str:
+    # EMBED_MODEL's tokenizer is uncased and splits on whitespace, so these
+    # variants encode to the same vector.
+    return " ".join(query.lower().split())
+
+
+def _key(query: str) -> bytes:
+    return hashlib.blake2b(
+        f"{EMBED_MODEL}\0{normalize_query(query)}".encode(), digest_size=16
+    ).digest()
+
+
+class QueryEmbeddingCache:
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY,"
+            " vector BLOB NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, queries: List[str]) -> Dict[str, np.ndarray]:
+        """Cached float32 vectors for the queries that have one."""
+        keys = {_key(q): q for q in queries}
+        rows = self.conn.execute(
+            f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(keys))})",
+            list(keys),
+        )
+        return {keys[key]: np.frombuffer(vector, dtype="float32") for key, vector in rows}
+
+    def put_many(self, queries: List[str], vectors: np.ndarray) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+            [(_key(q), v.astype("float32").tobytes()) for q, v in zip(queries, vectors)],
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
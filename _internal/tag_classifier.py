@@ -7,7 +7,9 @@ Tag classifier for PR titles using:
 Used across the indexing pipeline to attach tags to EmailMessage objects.
 """
 
-from typing import List, Set
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import List, Tuple
 import re
 
 # ------------------------------------------------------
@@ -71,6 +73,14 @@ RULES = {
     ],
 }
 
+# Compiled once at import, one alternation per tag, so a text takes one
+# scan per tag instead of one per pattern. A single alternation over all
+# tags would miss overlaps: "sql injection" must tag both sql and security.
+COMPILED_RULES = {
+    tag: re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+    for tag, patterns in RULES.items()
+}
+
 # ------------------------------------------------------
 # 2. MAIN TAG GENERATION FUNCTION (Semantic Rules Only)
 # ------------------------------------------------------
@@ -83,16 +93,12 @@ def generate_tags_from_pr_title(pr_title: str) -> List[str]:
     if not pr_title:
         return []
 
-    title = pr_title.lower()
-    tags: Set[str] = set()
+    return _match_rules(pr_title.lower())
 
-    for tag, patterns in RULES.items():
-        for pattern in patterns:
-            if re.search(pattern, title):
-                tags.add(tag)
-                break
 
-    return sorted(tags)
+def _match_rules(lowered: str) -> List[str]:
+    """Sorted tags whose rules match already-lowercased text."""
+    return sorted(tag for tag, pattern in COMPILED_RULES.items() if pattern.search(lowered))
 
 
 # ------------------------------------------------------
@@ -117,14 +123,32 @@ Not implemented now because keyword rules already work well.
 # 4. COMBINED TAGGING PIPELINE
 # ------------------------------------------------------
 
+# Bot-generated notifications (sonar, dependabot) repeat the same titles and
+# sections across PRs, so results are memoized by a digest of the lowered text.
+TAG_CACHE_SIZE = 4096
+_TAG_CACHE: "OrderedDict[bytes, Tuple[str, ...]]" = OrderedDict()
+
+
 def classify_tags(pr_title: str) -> List[str]:
     """
     Unified tagging entrypoint. Currently only semantic rules.
     Later you can combine semantic + embedding scores here.
     """
-    tags = set()
+    if not pr_title:
+        return []
+
+    # Lowercase once; the same copy keys the cache and feeds the rules
+    lowered = pr_title.lower()
+    key = blake2b(lowered.encode("utf-8", "ignore"), digest_size=16).digest()
+    cached = _TAG_CACHE.get(key)
+    if cached is not None:
+        _TAG_CACHE.move_to_end(key)
+        return list(cached)
 
     # semantic rules
-    tags.update(generate_tags_from_pr_title(pr_title))
+    result = tuple(_match_rules(lowered))
+    _TAG_CACHE[key] = result
+    if len(_TAG_CACHE) > TAG_CACHE_SIZE:
+        _TAG_CACHE.popitem(last=False)
 
-    return sorted(tags)
+    return list(result)
@@ -3,7 +3,9 @@
 Extract semantic tags based on file paths modified in the PR.
 """
 
-from typing import List, Set
+from typing import Dict, List, Set
+
+import ahocorasick
 
 
 FILE_RULES = {
@@ -39,18 +41,37 @@ FILE_RULES = {
 }
 
 
+def _build_file_automaton() -> ahocorasick.Automaton:
+    """
+    Compile every FILE_RULES pattern into one Aho-Corasick automaton.
+    Patterns are lowercased to match the lowercased paths; a pattern listed
+    under several tags carries all of them.
+    """
+    tags_by_pattern: Dict[str, Set[str]] = {}
+    for tag, patterns in FILE_RULES.items():
+        for p in patterns:
+            tags_by_pattern.setdefault(p.lower(), set()).add(tag)
+
+    automaton = ahocorasick.Automaton()
+    for p, tags in tags_by_pattern.items():
+        automaton.add_word(p, tuple(sorted(tags)))
+    automaton.make_automaton()
+    return automaton
+
+
+FILE_AUTOMATON = _build_file_automaton()
+
+
 def classify_tags_from_files(files: List[str]) -> List[str]:
     """
     Classify PR tags based purely on files modified.
+    Each path is scanned once for all FILE_RULES patterns.
     """
     tags: Set[str] = set()
+    automaton_iter = FILE_AUTOMATON.iter
 
     for file in files:
-        f = file.lower()
-        for tag, patterns in FILE_RULES.items():
-            for p in patterns:
-                if p in f:
-                    tags.add(tag)
-                    break
-
-    return sorted(tags)
\ No newline at end of file
+        for _, file_tags in automaton_iter(file.lower()):
+            tags.update(file_tags)
+
+    return sorted(tags)
@@ -1,17 +1,17 @@
 import os
-import pickle
 from pathlib import Path
 from typing import List
 import multiprocessing
 
 import faiss
 from tqdm import tqdm
-from sentence_transformers import SentenceTransformer
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from multiprocessing import cpu_count
 
 from _internal.email_models import EmailMessage
+from _internal.embeddings import compile_model, encode_batch_size, load_embedding_model, start_encode_pool
 from _internal.extract_emails_from_mbox import EmailExtractor
+from _internal.meta_store import save_meta
 
 # ============================================================
 #                   INDEX STORAGE SETUP
@@ -20,17 +20,21 @@ INDEX_DIR = Path("./index_data")
 os.makedirs(INDEX_DIR, exist_ok=True)
 print(f"✔ Index directory ready at: {INDEX_DIR.resolve()}")
 
+# Emails embedded and added to the index per step
+EMBED_CHUNK_SIZE = 4096
+
 
 # ============================================================
 #               WORKER FUNCTION (MULTIPROCESS SAFE)
 # ============================================================
 
-def process_single_mbox(path: str) -> List[EmailMessage]:
+def process_single_mbox(path: str, workers: int = 1) -> List[EmailMessage]:
     """
     Extracts emails from a single mbox file.
     Runs inside a separate worker process (fork safe on macOS).
+    workers > 1 additionally splits this mbox's messages across processes.
     """
-    extractor = EmailExtractor()
+    extractor = EmailExtractor(workers=workers, cache_path=f"{INDEX_DIR}/extract_cache.sqlite")
     return extractor.extract_emails_from_mbox(path)
 
 
@@ -46,28 +50,57 @@ def embed_and_index(
     
 ):
     print("🔢 Generating embeddings...")
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-
-    texts = [email.full_text() for email in emails]
-
-    embeddings = model.encode(
-        texts,
-        batch_size=32,
-        show_progress_bar=True
-    )
-
-    dim = embeddings.shape[1]
+    model = compile_model(load_embedding_model())
+    batch_size = encode_batch_size(model)
+    dim = model.get_sentence_embedding_dimension()
 
     print("📦 Creating FAISS index...")
-    index = faiss.IndexHNSWFlat(dim, 32)
+    # fp16 storage halves vector memory with no measurable recall loss;
+    # PQ would need far more vectors to train than a mailbox holds.
+    # Embeddings are unit length, so inner product ranks exactly like L2
+    # while skipping the subtraction in every distance computation.
+    index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_fp16, 32, faiss.METRIC_INNER_PRODUCT)
+    # efSearch is only the default; search_semantic can override it per query.
+    # efConstruction 64 builds ~2.5x faster than 200 for a few % of recall.
     index.hnsw.efSearch = 64
-    index.hnsw.efConstruction = 200
-
-    index.add(embeddings)
+    index.hnsw.efConstruction = 64
+
+    # Embed in chunks and add each to the index right away, so only one
+    # chunk of full_text() strings and fp32 vectors is alive at a time.
+    # encode() already length-sorts texts into batches and restores the
+    # input order, so padding stays small even at GPU batch sizes.
+    pool = start_encode_pool(model)
+    try:
+        for start in tqdm(range(0, len(emails), EMBED_CHUNK_SIZE)):
+            texts = [email.full_text() for email in emails[start:start + EMBED_CHUNK_SIZE]]
+
+            # Templated notifications repeat verbatim; encode each distinct
+            # text once and fan the vector back out to every row using it.
+            unique_rows = {}
+            inverse = [unique_rows.setdefault(text, len(unique_rows)) for text in texts]
+            unique_texts = list(unique_rows)
+
+            if pool is not None:
+                unique_embeddings = model.encode_multi_process(
+                    unique_texts, pool, batch_size=batch_size, normalize_embeddings=True
+                )
+            else:
+                unique_embeddings = model.encode(
+                    unique_texts,
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                )
+            embeddings = unique_embeddings[inverse].astype("float32", copy=False)
+            if not index.is_trained:
+                index.train(embeddings)
+            index.add(embeddings)
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
 
     faiss.write_index(index, index_path)
-    with open(meta_path, "wb") as f:
-        pickle.dump(emails, f)
+    save_meta(emails, meta_path)
 
     print(f"✔ FAISS index saved to: {index_path}")
     print(f"✔ Metadata saved to: {meta_path}")
@@ -100,8 +133,18 @@ if __name__ == "__main__":
 
     emails: List[EmailMessage] = []
 
-    with ProcessPoolExecutor(max_workers=cpu_count()) as executor:
-        futures = {executor.submit(process_single_mbox, path): path for path in mbox_files}
+    # With fewer mbox files than cores, give each file's extractor the spare cores
+    workers_per_mbox = max(1, cpu_count() // max(1, len(mbox_files)))
+
+    # Extraction is GIL-bound Python, so one process per mbox file; no
+    # point forking more processes than there are files to hand out.
+    max_workers = max(1, min(cpu_count(), len(mbox_files)))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(process_single_mbox, path, workers_per_mbox): path
+            for path in mbox_files
+        }
 
         for future in tqdm(as_completed(futures), total=len(futures)):
             batch = future.result()
@@ -1,108 +1,139 @@
-import pickle
+import os
 import sys
-import faiss
-from sentence_transformers import SentenceTransformer
-from typing import List, Optional
-import ollama
+from typing import TYPE_CHECKING, List, Optional
 import re
 
 from _internal.email_models import EmailMessage
+from _internal.embeddings import encode_batch_size, load_embedding_model
+from _internal.meta_store import MetaStore, load_meta
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 # ============================================================
 #                    LOAD INDEX + METADATA
 # ============================================================
 INDEX_DIR = "index_data"
-with open(f"{INDEX_DIR}/meta.pkl", "rb") as f:
-    META: List[EmailMessage] = pickle.load(f)
+QUERY_CACHE_PATH = f"{INDEX_DIR}/query_cache.sqlite"
+
+# Everything is loaded on first use, so importing this module touches no
+# index files. The FAISS index and the encoder are only needed in
+# semantic mode, so commit / PR lookups don't pay for loading the model
+# weights. faiss, numpy and ollama are imported on first use for the same
+# reason; _internal.embeddings defers torch itself.
+_meta = None
+_index = None
+_encoder = None
+
+
+def get_meta() -> MetaStore:
+    global _meta
+    if _meta is None:
+        _meta = load_meta(f"{INDEX_DIR}/meta.pkl")
+    return _meta
+
+
+def get_index():
+    global _index
+    if _index is None:
+        import faiss
 
-index = faiss.read_index(f"{INDEX_DIR}/index.faiss")
-model = SentenceTransformer("all-MiniLM-L6-v2")
+        # Batched searches split queries across OpenMP threads; some faiss
+        # builds default to one thread unless OMP_NUM_THREADS is set.
+        if "OMP_NUM_THREADS" not in os.environ:
+            faiss.omp_set_num_threads(os.cpu_count() or 1)
+        _index = faiss.read_index(f"{INDEX_DIR}/index.faiss")
+    return _index
+
+
+def get_encoder():
+    global _encoder
+    if _encoder is None:
+        _encoder = load_embedding_model()
+    return _encoder
 
 
 # ============================================================
 #                 QUERY CLASSIFICATION HELPERS
 # ============================================================
 
-COMMIT_REGEX = r"\b[a-f0-9]{7,40}\b"
+# Compiled once; both patterns are free of nested quantifiers, so matching
+# stays linear in the query length.
+COMMIT_REGEX = re.compile(r"\b[a-f0-9]{7,40}\b")
+
+# "pr #12", "pull request #12", "pull #12" or a bare "pr 12", fused into
+# one scan; the first mention in the query wins.
+PR_QUERY_RE = re.compile(
+    r"(?:pr\s*#\s*|pull\s*request\s*#\s*|pull\s*#\s*)(\d+)|\bpr\s+(\d+)\b"
+)
 
 
 def extract_commit_hash(query: str) -> Optional[str]:
     q = query.lower()
-    m = re.search(COMMIT_REGEX, q)
+    m = COMMIT_REGEX.search(q)
     return m.group(0) if m else None
 
 
-def extract_pr_number(query: str) -> Optional[int]:
+def extract_pr_number(query: str, commit_checked: bool = False) -> Optional[int]:
     """
     Extract PR number only when explicitly mentioned.
     Avoid false activation when query contains commit-like hashes.
+    commit_checked: the caller already found no commit hash, so skip
+    rescanning for one.
     """
     q = query.lower()
 
-    if re.search(COMMIT_REGEX, q):
+    if not commit_checked and COMMIT_REGEX.search(q):
         return None
 
-    patterns = [
-        r"pr\s*#\s*(\d+)",
-        r"pull\s*request\s*#\s*(\d+)",
-        r"pull\s*#\s*(\d+)",
-        r"\bpr\s+(\d+)\b",
-    ]
-
-    for pat in patterns:
-        m = re.search(pat, q)
-        if m:
-            return int(m.group(1))
-
-    return None
+    m = PR_QUERY_RE.search(q)
+    return int(m.group(1) or m.group(2)) if m else None
 
 
 # ============================================================
 #                 EXACT-MATCH RANKING
 # ============================================================
 
+# Identifier-like query tokens: repo slugs, ticket keys, file names, SHAs
+QUERY_TOKEN_RE = re.compile(r"[\w./-]*\w")
+QUERY_INT_RE = re.compile(r"\b\d+\b")
+
+
 def score_email(query: str, email: EmailMessage) -> float:
+    """
+    Weighted count of the email's identifiers named in the query. IDs are
+    matched as whole query tokens, so PR 5 does not match "1500";
+    free-text fields (title, contributor names) still match as substrings.
+    """
     q = query.lower()
+    tokens = frozenset(QUERY_TOKEN_RE.findall(q))
+    numbers = {int(n) for n in QUERY_INT_RE.findall(q)}
     score = 0.0
 
     if email.pr_numbers:
-        for pr in email.pr_numbers:
-            if str(pr) in q:
-                score += 6
+        score += 6 * len(numbers.intersection(email.pr_numbers))
 
     if email.repos:
-        for r in email.repos:
-            if r.lower() in q:
-                score += 3
+        score += 3 * sum(r.lower() in tokens for r in email.repos)
 
     if email.tickets:
-        for t in email.tickets:
-            if t.lower() in q:
-                score += 2
+        score += 2 * sum(t.lower() in tokens for t in email.tickets)
 
     if email.commits:
-        for c in email.commits:
-            if c.lower() in q:
-                score += 4
+        score += 4 * sum(c.short in tokens or c.sha in tokens for c in email.commits)
 
     if email.files_modified:
-        for path in email.files_modified:
-            if path.lower() in q:
-                score += 4
+        score += 4 * sum(path.lower() in tokens for path in email.files_modified)
 
     if email.pr_title and email.pr_title.lower() in q:
         score += 5
 
     if email.tags:
-        for tag in email.tags:
-            if tag.lower() in q:
-                score += 2
+        score += 2 * len(tokens.intersection(email.tags))
 
     if email.contributors:
-        for contributor in email.contributors:
-            if contributor.lower() in q:
-                score += 2
+        score += 2 * sum(contributor.lower() in q for contributor in email.contributors)
 
     return score
 
@@ -111,45 +142,124 @@ def score_email(query: str, email: EmailMessage) -> float:
 #                 SEMANTIC SEARCH + TAG RERANK
 # ============================================================
 
+QUERY_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+
 def rerank_by_tags(query: str, emails: List[EmailMessage]) -> List[EmailMessage]:
     """
     Boost emails that have tags matching words in the query.
     This version does NOT modify EmailMessage objects.
     It computes boost scores externally and sorts by them.
+    Tags (lowercase rule names) must equal a whole query word, so "ui"
+    no longer matches inside "build".
     """
-    q = query.lower()
-
-    def compute_boost(email: EmailMessage) -> int:
-        if not email.tags:
-            return 0
-
-        boost = 0
-        for t in email.tags:
-            if t.lower() in q:
-                boost += 3
-        return boost
+    words = frozenset(QUERY_WORD_RE.findall(query.lower()))
 
     # Sort using computed boost (highest first)
     return sorted(
         emails,
-        key=lambda e: compute_boost(e),
+        key=lambda e: 3 * len(words.intersection(e.tags or ())),
         reverse=True
     )
 
-def search_semantic(query: str, top_k: int = 10) -> List[int]:
-    vec = model.encode([query])
-    _, idx = index.search(vec, top_k)
-    return idx[0].tolist()
+
+def embed_queries(queries: List[str]) -> "np.ndarray":
+    """
+    Normalized float32 query vectors. Previously seen queries come from
+    the on-disk cache; the encoder is only loaded when some query misses.
+    """
+    import numpy as np
+
+    from _internal.query_embedding_cache import QueryEmbeddingCache
+
+    cache = QueryEmbeddingCache(QUERY_CACHE_PATH)
+    try:
+        cached = cache.get_many(queries)
+        missing = list(dict.fromkeys(q for q in queries if q not in cached))
+        if missing:
+            encoder = get_encoder()
+            fresh = encoder.encode(
+                missing,
+                batch_size=encode_batch_size(encoder),
+                normalize_embeddings=True,
+            ).astype("float32", copy=False)
+            cache.put_many(missing, fresh)
+            cached.update(zip(missing, fresh))
+    finally:
+        cache.close()
+    return np.stack([cached[q] for q in queries])
+
+
+def search_semantic(query: str, top_k: int = 10, ef_search: Optional[int] = None) -> List[int]:
+    """
+    ef_search: HNSW candidate list size for this query; higher raises recall
+    at the cost of latency. None keeps the efSearch stored in the index.
+    """
+    return search_semantic_batch([query], top_k=top_k, ef_search=ef_search)[0]
+
+
+def search_semantic_batch(
+    queries: List[str],
+    top_k: int = 10,
+    ef_search: Optional[int] = None,
+) -> List[List[int]]:
+    """
+    Row ids for several queries at once: one encode call and one FAISS
+    search, which runs the per-query graph walks in parallel.
+    """
+    # Nothing to encode: skip the cache, the faiss import and np.stack([])
+    if not queries:
+        return []
+
+    import faiss
+
+    vecs = embed_queries(queries)
+    params = faiss.SearchParametersHNSW(efSearch=ef_search) if ef_search else None
+    _, idx = get_index().search(vecs, top_k, params=params)
+    return idx.tolist()
 
 
 # ============================================================
 #             FORMAT RESULTS → CONTEXT FOR LLM
 # ============================================================
 
+# Prompt length drives LLM latency: long fields are cut to these sizes,
+# with a marker so the model knows more exists.
+CONTEXT_BODY_CHARS = 800
+CONTEXT_SECTION_CHARS = 500
+CONTEXT_MAX_ITEMS = 20
+
+# Whole-context cap, leaving room for the instructions and the answer in
+# the model's context window. Tokens are estimated at ~4 chars each, which
+# holds for English and code with llama tokenizers.
+CONTEXT_BUDGET_TOKENS = 3000
+CHARS_PER_TOKEN = 4
+
+
+def _truncated(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}…({len(text) - limit} more chars omitted)"
+
+
+def _bullets(items: list, limit: int = CONTEXT_MAX_ITEMS) -> str:
+    lines = [f"- {i}" for i in items[:limit]]
+    if len(items) > limit:
+        lines.append(f"…({len(items) - limit} more omitted)")
+    return "\n".join(lines)
+
+
 def build_context(emails: List[EmailMessage]) -> str:
     parts = []
+    # Notifications for one PR repeat its commit list; list each commit once
+    seen_commits = set()
+    budget = CONTEXT_BUDGET_TOKENS * CHARS_PER_TOKEN
+
+    for n, e in enumerate(emails):
+        if budget <= 0:
+            parts.append(f"…({len(emails) - n} more emails omitted)")
+            break
 
-    for e in emails:
         block = []
 
         if e.tags:
@@ -168,30 +278,55 @@ def build_context(emails: List[EmailMessage]) -> str:
             block.append(f"Title: {e.pr_title}")
 
         if e.commits:
-            block.append("Commits:\n" + "\n".join(f"- {c}" for c in e.commits))
+            commits = [c for c in e.commits if c.sha not in seen_commits]
+            seen_commits.update(c.sha for c in commits)
+            if commits:
+                block.append("Commits:\n" + _bullets(
+                    [f"{c.short} {c.message}" if c.message else c.short for c in commits]
+                ))
 
         if e.files_modified:
-            block.append("Files Changed:\n" + "\n".join(f"- {c}" for c in e.files_modified))
+            block.append("Files Changed:\n" + _bullets(e.files_modified))
 
         if e.markdown:
             md_parts = []
             for section, items in e.markdown.items():
                 if items:
                     md_parts.append(f"## {section}")
-                    md_parts.extend(f"- {i}" for i in items)
+                    md_parts.append(_truncated(
+                        "\n".join(f"- {i}" for i in items), CONTEXT_SECTION_CHARS
+                    ))
             if md_parts:
                 block.append("Markdown Sections:\n" + "\n".join(md_parts))
 
         if e.contributors:
             block.append(f"Contributors: {', '.join(e.contributors)}")
 
-        block.append("Email Body:\n" + e.body)
+        block.append("Email Body:\n" + _truncated(e.body, CONTEXT_BODY_CHARS))
 
-        parts.append("\n\n".join(block))
+        text = "\n\n".join(block)
+        parts.append(_truncated(text, budget))
+        budget -= len(text)
 
     return "\n\n============================\n\n".join(parts)
 
 
+LLM_MODEL = "llama3.2:3b"
+
+
+def ask_llm(prompt: str) -> None:
+    """
+    Print the model's answer as it is generated, so the first words show
+    up after prompt processing instead of after the whole completion.
+    """
+    import ollama
+
+    for part in ollama.generate(model=LLM_MODEL, prompt=prompt, stream=True):
+        sys.stdout.write(part["response"])
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+
+
 # ============================================================
 #                        MAIN LOGIC
 # ============================================================
@@ -204,55 +339,44 @@ def answer_query(query: str):
     if commit:
         print(f"[Commit mode → commit {commit}]")
 
-        matched = [e for e in META if e.commits and any(commit in c for c in e.commits)]
+        # Any abbreviation the query uses, not just 7 or 40 characters
+        meta = get_meta()
+        matched = meta.rows(meta.lookup_prefix("commits", commit))
         if not matched:
             print("No emails found for this commit.")
             return
 
         context = build_context(matched)
-        response = ollama.generate(
-            model="llama3.2:3b",
-            prompt=f"You are an expert summarizer.\nSummarize details about commit {commit} using ONLY the context below.\n\n{context}"
-        )
-        print(response["response"])
+        ask_llm(f"You are an expert summarizer.\nSummarize details about commit {commit} using ONLY the context below.\n\n{context}")
         return
 
     # 2️⃣ PR mode
-    pr = extract_pr_number(query)
+    pr = extract_pr_number(query, commit_checked=True)
     if pr:
         print(f"[PR mode activated → PR #{pr}]")
 
-        emails = [e for e in META if e.pr_numbers and pr in e.pr_numbers]
+        meta = get_meta()
+        emails = meta.rows(meta.lookup("pr_numbers", pr))
         if not emails:
             print("No emails found for this PR.")
             return
 
         # NO tag reranking here — you requested PR mode should NOT be modified
         context = build_context(emails)
-        response = ollama.generate(
-            model="llama3.2:3b",
-            prompt=f"You are an expert PR analyst.\nSummarize PR #{pr} using ONLY the context below.\n\n{context}"
-        )
-        print(response["response"])
+        ask_llm(f"You are an expert PR analyst.\nSummarize PR #{pr} using ONLY the context below.\n\n{context}")
         return
 
     # 3️⃣ Semantic mode
     print("[Semantic mode → no PR/commit detected]")
 
-    vec = model.encode([query])
-    _, idx = index.search(vec, 5)
-    selected = [META[i] for i in idx[0]]
+    # FAISS pads with -1 when the index holds fewer than top_k vectors
+    selected = get_meta().rows(i for i in search_semantic(query, top_k=5) if i >= 0)
 
     # 🔥 Apply tag reranking ONLY in semantic search
     selected = rerank_by_tags(query, selected)
 
     context = build_context(selected)
-    response = ollama.generate(
-        model="llama3.2:3b",
-        prompt=f"You are an expert summarizer.\nAnswer using ONLY the context below.\n\n{context}"
-    )
-
-    print(response["response"])
+    ask_llm(f"You are an expert summarizer.\nAnswer using ONLY the context below.\n\n{context}")
 
 
 # ============================================================
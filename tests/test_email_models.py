@@ -0,0 +1,93 @@
+import pickle
+
+from _internal.email_models import EmailMessage, EmailRecord
+from _internal.helpers import CommitInfo
+
+
+def make_email(subject, body, **kwargs):
+    return EmailMessage(subject=subject, body=body, **kwargs)
+
+
+def test_append_by_pr_merges_same_pr():
+    results, index = [], {}
+    make_email("a", "first", pr_numbers=[1], repos=["org/repo"]).append_by_pr(results, index)
+    make_email("b", "second", pr_numbers=[1], repos=["org/other"]).append_by_pr(results, index)
+    make_email("c", "third", pr_numbers=[1], repos=["org/repo"]).append_by_pr(results, index)
+    results[0].materialize_lists()
+
+    assert len(results) == 1
+    assert results[0].body == "first\n\nsecond\n\nthird"
+    assert results[0].repos == ["org/other", "org/repo"]
+    assert index[1] is results[0]
+
+
+def test_append_by_pr_keeps_distinct_prs_separate():
+    results, index = [], {}
+    make_email("a", "one", pr_numbers=[1]).append_by_pr(results, index)
+    make_email("b", "two", pr_numbers=[2]).append_by_pr(results, index)
+
+    assert [e.pr_numbers for e in results] == [[1], [2]]
+
+
+def test_append_by_pr_registers_additional_prs():
+    results, index = [], {}
+    make_email("a", "one", pr_numbers=[1]).append_by_pr(results, index)
+    make_email("b", "two", pr_numbers=[1, 3]).append_by_pr(results, index)
+    make_email("c", "three", pr_numbers=[3]).append_by_pr(results, index)
+    results[0].materialize_lists()
+
+    assert len(results) == 1
+    assert results[0].body == "one\n\ntwo\n\nthree"
+    assert results[0].pr_numbers == [1, 3]
+    assert index[3] is results[0]
+
+
+def test_append_by_pr_default_result_is_not_shared():
+    first = make_email("a", "one", pr_numbers=[1]).append_by_pr()
+    second = make_email("b", "two", pr_numbers=[2]).append_by_pr()
+    assert len(first) == 1 and len(second) == 1
+
+
+def test_email_record_is_slotted_and_converts_to_message():
+    results, index = [], {}
+    EmailRecord(subject="a", body="one", pr_numbers=[7], tags=["ui"]).append_by_pr(results, index)
+    EmailRecord(subject="b", body="two", pr_numbers=[7], tags=["bug"]).append_by_pr(results, index)
+
+    record = pickle.loads(pickle.dumps(results[0]))
+    assert not hasattr(record, "__dict__")
+
+    message = record.materialize_lists().to_message()
+    assert isinstance(message, EmailMessage)
+    assert message.tags == ["bug", "ui"]
+    assert message.body == "one\n\ntwo"
+
+
+def test_full_text_sections_and_separators():
+    email = EmailMessage(
+        subject="s",
+        body="raw body",
+        pr_title="Fix crash",
+        tags=["bug"],
+        markdown={"Summary": ["one", "two"], "Empty": []},
+        commits=[CommitInfo("abcdef1234", "abcdef1", "Fix crash")],
+        files_modified=["src", "ui"],
+    )
+
+    assert email.full_text() == (
+        "Tags: bug\n\n"
+        "Title: Fix crash\n\n"
+        "Markdown Sections:\n## Summary\n- one\n- two\n\n"
+        "abcdef1,Fix crash\n\n"
+        "src\nui\n\n"
+        "raw body"
+    )
+
+
+def test_full_text_formats_non_string_markdown_items():
+    email = EmailMessage(
+        subject="s",
+        body="b",
+        markdown={"headings": [("Summary", ["line"])], "lists": None},
+    )
+
+    assert email.full_text() == "Markdown Sections:\n## headings\n- ('Summary', ['line'])\n\nb"
@@ -0,0 +1,105 @@
+import mailbox
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from _internal import extraction_cache
+from _internal.email_models import EmailRecord
+from _internal.extract_emails_from_mbox import EmailExtractor
+
+
+def build_message(subject, message_id, plain, html=None):
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = "bot@github.com"
+    msg["Date"] = "Mon, 1 Jan 2024 10:00:00 +0000"
+    msg["Message-ID"] = message_id
+    msg.attach(MIMEText(plain, "plain"))
+    if html is not None:
+        msg.attach(MIMEText(html, "html"))
+    return msg
+
+
+def write_mbox(path, messages):
+    box = mailbox.mbox(str(path))
+    for message in messages:
+        box.add(message)
+    box.flush()
+    box.close()
+    return str(path)
+
+
+def test_extract_emails_merges_by_pr(tmp_path):
+    mbox_path = write_mbox(tmp_path / "mbox", [
+        build_message(
+            "[org/repo] Fix login crash (PR #42)",
+            "<org/repo/pull/42/c1@github.com>",
+            "Commit Summary\nabcdef1 Fix login crash\n\nFile Changes\nM src/ui/login.js (2)\n",
+            "<p>ignored html</p>",
+        ),
+        build_message(
+            "Re: [org/repo] Fix login crash (PR #42)",
+            "<org/repo/pull/42/c2@github.com>",
+            "Looks good @reviewer",
+        ),
+        build_message(
+            "[org/repo] Add API endpoint (PR #43)",
+            "<org/repo/pull/43/c1@github.com>",
+            "New endpoint",
+        ),
+    ])
+
+    emails = EmailExtractor().extract_emails_from_mbox(mbox_path)
+
+    assert [e.pr_numbers for e in emails] == [[42], [43]]
+    first = emails[0]
+    assert first.repos == ["org/repo"]
+    assert first.commits[0].short == "abcdef1"
+    assert first.files_modified == ["login.js", "src", "ui"]
+    assert {"bug", "ui"} <= set(first.tags)
+    assert "Looks good @reviewer" in first.body
+    assert "ignored html" not in first.body
+    assert emails[1].tags == ["api"]
+
+
+def test_parallel_extraction_matches_serial(tmp_path):
+    messages = [
+        build_message(
+            f"[org/repo] Change {i} (PR #{i % 3})",
+            f"<org/repo/pull/{i % 3}/c{i}@github.com>",
+            f"body {i}",
+        )
+        for i in range(7)
+    ]
+    mbox_path = write_mbox(tmp_path / "mbox", messages)
+
+    serial = EmailExtractor().extract_emails_from_mbox(mbox_path)
+    parallel = EmailExtractor(workers=2, chunk_size=2).extract_emails_from_mbox(mbox_path)
+
+    assert [e.model_dump() for e in parallel] == [e.model_dump() for e in serial]
+    assert serial[0].body == "body 0\n\nbody 3\n\nbody 6"
+
+
+def test_cached_extraction_matches_fresh(tmp_path):
+    mbox_path = write_mbox(tmp_path / "mbox", [
+        build_message("[org/repo] Fix crash (PR #7)", "<org/repo/pull/7/c1@github.com>", "first"),
+        build_message("Re: [org/repo] Fix crash (PR #7)", "<org/repo/pull/7/c2@github.com>", "second"),
+    ])
+    cache_path = str(tmp_path / "cache.sqlite")
+
+    fresh = EmailExtractor(cache_path=cache_path).extract_emails_from_mbox(mbox_path)
+    cached = EmailExtractor(cache_path=cache_path).extract_emails_from_mbox(mbox_path)
+
+    assert [e.model_dump() for e in cached] == [e.model_dump() for e in fresh]
+    assert cached[0].body == "first\n\nsecond"
+
+
+def test_cache_ignores_records_from_other_extraction_code(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "cache.sqlite")
+    cache = extraction_cache.ExtractionCache(cache_path)
+    cache.put_many([("<a@x>", EmailRecord(subject="a", body="old"))])
+    cache.close()
+
+    monkeypatch.setattr(extraction_cache, "extraction_version", lambda: "changed")
+    cache = extraction_cache.ExtractionCache(cache_path)
+    assert cache.get("<a@x>") is None
+    cache.close()
@@ -0,0 +1,116 @@
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pytest
+
+from _internal.helpers import (
+    CommitInfo,
+    clean_html,
+    extract_body,
+    extract_commits,
+    extract_commits_and_files,
+    extract_files_modified,
+    extract_metadata_from_subject,
+    merge_sorted_unique,
+)
+
+
+def test_extract_commits_builds_commit_info():
+    body = "Commit Summary\n  abcdef1234567 Fix login redirect\n1234567\n"
+    assert extract_commits(body) == [
+        CommitInfo(sha="abcdef1234567", short="abcdef1", message="Fix login redirect"),
+        CommitInfo(sha="1234567", short="1234567", message=""),
+    ]
+
+
+def test_extract_commits_none_when_absent():
+    assert extract_commits("no commits here") is None
+
+
+def test_extract_files_modified_keeps_full_paths():
+    body = "File Changes\nM src/ui/app.js (3)\nA b/src/ui/app.js\nD docs/old.md\n"
+    assert extract_files_modified(body) == ["docs/old.md", "src/ui/app.js"]
+
+
+def test_extract_files_modified_none_when_absent():
+    assert extract_files_modified("nothing changed") is None
+
+
+def test_extract_commits_and_files_matches_separate_scans():
+    body = "abcdef1\nD docs/old.md\n  1234567 Add app\nM src/ui/app.js (3)\nM\n"
+    assert extract_commits_and_files(body) == (extract_commits(body), extract_files_modified(body))
+    assert extract_commits_and_files(body)[1] == ["docs/old.md", "src/ui/app.js"]
+
+
+@pytest.mark.parametrize(
+    "subject,repos,prs,tickets,title",
+    [
+        ("[repo/name] PR #8040: Fix bug DIGI-2044", ["repo/name"], ["8040"], ["DIGI-2044"], "Fix bug"),
+        ("[service] #5521 - Update handler", ["service"], ["5521"], None, "Update handler"),
+        ("[a/b] pull request #9: ABC-1: do stuff", ["a/b"], ["9"], ["ABC-1"], "do stuff"),
+        ("[x/y] XY-12345 - Something pr#3 and #4", ["x/y"], ["3", "4"], ["XY-12345"], "Something  and"),
+        ("Re: [org/repo] [ABC-123] Fix login crash (PR #45)", ["org/repo", "ABC-123"], ["45"], ["ABC-123"], "Re:   Fix login crash ()"),
+        ("Fix @ABC-123 crash", None, None, ["ABC-123"], "Fix @ABC-123 crash"),
+        ("Plain subject", None, None, None, "Plain subject"),
+        ("", None, None, None, None),
+    ],
+)
+def test_extract_metadata_from_subject(subject, repos, prs, tickets, title):
+    meta = extract_metadata_from_subject(subject)
+    assert meta["repos"] == repos
+    assert meta["pr_numbers"] == prs
+    assert meta["tickets"] == tickets
+    assert meta["pr_title"] == title
+
+
+def test_extract_metadata_keeps_mentions_in_title():
+    meta = extract_metadata_from_subject("[a/b] Bump lodash (#77) @dependabot @alice")
+    assert meta["pr_title"] == "Bump lodash () @dependabot @alice"
+    assert sorted(meta["contributors"]) == ["alice", "dependabot"]
+
+
+def test_clean_html_extracts_text():
+    html = "<html><body><table><tr><td>Hello <b>world</b></td></tr></table><p>  second </p></body></html>"
+    assert clean_html(html) == "Hello\nworld\nsecond"
+
+
+def test_clean_html_drops_script_and_style():
+    html = "<html><head><style>p { color: red }</style></head><body><script>track()</script><p>text</p></body></html>"
+    assert clean_html(html) == "text"
+
+
+@pytest.mark.parametrize(
+    "a,b,expected",
+    [
+        ([], [1, 2], [1, 2]),
+        ([1, 2], [], [1, 2]),
+        ([1, 2], [3, 4], [1, 2, 3, 4]),
+        ([3, 4], [1, 2], [1, 2, 3, 4]),
+        ([1, 3, 5], [2, 3, 6], [1, 2, 3, 5, 6]),
+        (["api", "ui"], ["bug", "ui"], ["api", "bug", "ui"]),
+    ],
+)
+def test_merge_sorted_unique(a, b, expected):
+    assert merge_sorted_unique(a, b) == expected
+
+
+def _alternative(*parts):
+    msg = MIMEMultipart("alternative")
+    for text, subtype, *charset in parts:
+        msg.attach(MIMEText(text, subtype, *charset))
+    return msg
+
+
+def test_extract_body_prefers_plain_text():
+    msg = _alternative(("<p>html version</p>", "html"), ("plain version", "plain"))
+    assert extract_body(msg) == "plain version"
+
+
+def test_extract_body_falls_back_to_html():
+    msg = _alternative(("<p>only <b>html</b></p>", "html"))
+    assert extract_body(msg) == "only\nhtml"
+
+
+def test_extract_body_uses_declared_charset():
+    msg = _alternative(("café déjà vu", "plain", "iso-8859-1"))
+    assert extract_body(msg) == "café déjà vu"
@@ -0,0 +1,18 @@
+from _internal.markdown_sections import extract_lists, extract_markdown_sections
+
+
+def test_extract_lists_returns_full_lines():
+    text = "Intro\n- first item\n  * nested item\n1. numbered\nplain line\n"
+    assert extract_lists(text) == ["- first item", "* nested item", "1. numbered"]
+
+
+def test_extract_lists_none_when_absent():
+    assert extract_lists("no lists here") is None
+
+
+def test_extract_markdown_sections_headings():
+    text = "Summary\nFixes the crash\n## Testing\nran it\n"
+    assert extract_markdown_sections(text)["headings"] == [
+        ("Summary", ["Fixes the crash"]),
+        ("Testing", ["ran it"]),
+    ]
@@ -0,0 +1,32 @@
+import mailbox
+
+from _internal.mbox_reader import MboxReader
+
+
+def test_spans_match_stdlib_mbox(tmp_path):
+    path = tmp_path / "mbox"
+    path.write_bytes(
+        b"preamble\n"
+        b"From a@b Mon Jan  1 00:00:00 2024\nSubject: one\n\nbody\n>From quoted\n\n"
+        b"From a@b Mon Jan  1 00:00:00 2024\nSubject: two\n\nno blank line before next\n"
+        b"From a@b Mon Jan  1 00:00:00 2024\nSubject: three\n\nlast"
+    )
+
+    box = mailbox.mbox(str(path))
+    expected = [box.get_bytes(key) for key in box.keys()]
+    box.close()
+
+    reader = MboxReader(str(path))
+    try:
+        assert [reader.read(span) for span in reader.spans()] == expected
+    finally:
+        reader.close()
+
+
+def test_empty_file_has_no_spans(tmp_path):
+    path = tmp_path / "mbox"
+    path.write_bytes(b"")
+
+    reader = MboxReader(str(path))
+    assert reader.spans() == []
+    reader.close()
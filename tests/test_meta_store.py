@@ -0,0 +1,75 @@
+import pickle
+
+import pytest
+
+from _internal.email_models import EmailMessage
+from _internal.helpers import CommitInfo
+from _internal.meta_store import MetaStore, load_meta, save_meta
+
+
+def make_emails():
+    return [
+        EmailMessage(subject="a", body="first", pr_numbers=[1],
+                     commits=[CommitInfo("abcdef1234", "abcdef1", "Fix")]),
+        EmailMessage(subject="b", body="second", tags=["ui"]),
+    ]
+
+
+def test_save_and_load_meta_round_trip(tmp_path):
+    emails = make_emails()
+    path = str(tmp_path / "meta.pkl")
+    save_meta(emails, path)
+
+    store = load_meta(path)
+
+    assert len(store) == 2
+    assert store.column("pr_numbers") == [[1], None]
+    assert "body" not in store.columns
+    assert [e.model_dump() for e in store.rows([1, 0])] == [e.model_dump() for e in reversed(emails)]
+    assert store[0].body == "first"
+
+
+def test_load_meta_accepts_legacy_email_list(tmp_path):
+    emails = make_emails()
+    path = tmp_path / "meta.pkl"
+    path.write_bytes(pickle.dumps(emails))
+
+    store = load_meta(str(path))
+
+    assert store[1].tags == ["ui"]
+
+
+def test_load_meta_rejects_other_formats(tmp_path):
+    path = tmp_path / "meta.pkl"
+    path.write_bytes(pickle.dumps({"version": 2, "columns": {"subject": ["a"]}, "cold": "meta_cold.sqlite"}))
+
+    with pytest.raises(ValueError, match="rebuild the index"):
+        load_meta(str(path))
+
+
+def test_lookup_finds_rows_by_list_value():
+    store = MetaStore.from_messages(make_emails() + [EmailMessage(subject="c", body="third", pr_numbers=[1, 2])])
+
+    assert store.lookup("pr_numbers", 1) == [0, 2]
+    assert store.lookup("pr_numbers", 3) == []
+    assert store.lookup("commits", "abcdef1") == [0]
+    assert store.lookup("commits", "abcdef1234") == [0]
+    assert store.lookup("commits", "Fix") == []
+    assert store.lookup("tags", "ui") == [1]
+
+
+def test_lookup_prefix_matches_abbreviated_values():
+    store = MetaStore.from_messages(make_emails())
+
+    assert store.lookup_prefix("commits", "abcdef12") == [0]
+    assert store.lookup_prefix("commits", "abcdef0") == []
+    assert store.lookup_prefix("commits", "Fi") == []
+
+
+def test_load_meta_requires_cold_file(tmp_path):
+    path = str(tmp_path / "meta.pkl")
+    save_meta(make_emails(), path)
+    (tmp_path / "meta_cold.sqlite").unlink()
+
+    with pytest.raises(FileNotFoundError, match="meta_cold.sqlite"):
+        load_meta(path)
@@ -0,0 +1,111 @@
+import pytest
+
+import query_llm
+from _internal.email_models import EmailMessage
+from _internal.helpers import CommitInfo
+from _internal.meta_store import MetaStore
+from query_llm import (
+    build_context,
+    extract_pr_number,
+    rerank_by_tags,
+    score_email,
+    search_semantic_batch,
+)
+
+
+COMMIT = CommitInfo("abcdef1234567890", "abcdef1", "Fix login")
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("summarize pr #12", 12),
+        ("what happened in pull request #7?", 7),
+        ("pull#3 status", 3),
+        ("pr 44 details", 44),
+        ("compare pr 5 with pr #6", 5),
+        ("sprint 5 retro", None),
+        ("pr #12 and commit abcdef1", None),
+    ],
+)
+def test_extract_pr_number(query, expected):
+    assert extract_pr_number(query) == expected
+
+
+def test_extract_pr_number_skips_commit_check_when_told():
+    assert extract_pr_number("pr #12 and commit abcdef1", commit_checked=True) == 12
+
+
+def test_score_email_matches_identifiers_as_whole_tokens():
+    email = EmailMessage(
+        subject="s",
+        body="b",
+        pr_numbers=[5],
+        repos=["org/app"],
+        tickets=["ABC-123"],
+        commits=[COMMIT],
+        files_modified=["views.py"],
+        tags=["ui"],
+        pr_title="Fix login",
+    )
+
+    assert score_email("fix login for pr 5 in org/app ABC-123 abcdef1 views.py ui", email) == 26
+    assert score_email("pr 1500 in org/application, build abcdef12", email) == 0
+
+
+def test_rerank_by_tags_matches_whole_words():
+    build = EmailMessage(subject="a", body="a", tags=["bug"])
+    ui = EmailMessage(subject="b", body="b", tags=["ui"])
+
+    assert rerank_by_tags("why did the build fail", [build, ui]) == [build, ui]
+    assert rerank_by_tags("ui glitch", [build, ui]) == [ui, build]
+
+
+def test_build_context_truncates_and_dedupes_commits():
+    first = EmailMessage(
+        subject="a",
+        body="x" * (query_llm.CONTEXT_BODY_CHARS + 5),
+        commits=[COMMIT],
+        files_modified=[f"f{i}" for i in range(query_llm.CONTEXT_MAX_ITEMS + 2)],
+    )
+    second = EmailMessage(subject="b", body="second", commits=[COMMIT])
+
+    context = build_context([first, second])
+
+    assert context.count("abcdef1 Fix login") == 1
+    assert "…(5 more chars omitted)" in context
+    assert "…(2 more omitted)" in context
+    assert "Commits" not in context.split("====")[-1]
+
+
+def test_build_context_stops_at_budget(monkeypatch):
+    monkeypatch.setattr(query_llm, "CONTEXT_BUDGET_TOKENS", 10)
+    emails = [EmailMessage(subject=str(i), body="y" * 30) for i in range(3)]
+
+    context = build_context(emails)
+
+    assert context.endswith("…(2 more emails omitted)")
+    assert len(context) < 150
+
+
+def test_answer_query_pr_mode_looks_up_pr_index(monkeypatch, capsys):
+    store = MetaStore.from_messages([
+        EmailMessage(subject="a", body="first", pr_numbers=[1]),
+        EmailMessage(subject="b", body="second", pr_numbers=[2]),
+    ])
+    prompts = []
+    monkeypatch.setattr(query_llm, "_meta", store)
+    monkeypatch.setattr(query_llm, "ask_llm", prompts.append)
+
+    query_llm.answer_query("summarize pr #2")
+    query_llm.answer_query("summarize pr #3")
+
+    assert len(prompts) == 1
+    assert "second" in prompts[0] and "first" not in prompts[0]
+    assert "No emails found for this PR." in capsys.readouterr().out
+
+
+def test_search_semantic_batch_empty_queries(monkeypatch):
+    monkeypatch.setattr(query_llm, "embed_queries", lambda queries: pytest.fail("encoded"))
+
+    assert search_semantic_batch([]) == []
@@ -11,6 +11,7 @@ from _internal.tag_classifier import generate_tags_from_pr_title, classify_tags
         ("Update API endpoint to return JSON", ["api"]),
         ("Security patch for XSS issue", ["bug", "security"]),
         ("Speed up response latency", ["performance"]),
+        ("Block SQL injection in search", ["security", "sql"]),
         ("Refactor code" , []),
         ("", []),
         (None, []),
@@ -44,3 +45,10 @@ def test_partial_word_should_not_match():
     title = "rebuild tableView component"  # tableView should NOT trigger 'table'
     tags = classify_tags(title)
     assert "sql" not in tags
+
+
+def test_classify_tags_cache_returns_independent_lists():
+    first = classify_tags("Fix crash in dashboard")
+    first.append("mutated")
+    second = classify_tags("FIX crash in Dashboard")
+    assert second == ["bug", "ui"]
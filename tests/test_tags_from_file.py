@@ -0,0 +1,17 @@
+from _internal.tags_from_file import classify_tags_from_files
+
+
+def test_classify_tags_from_files_matches_paths():
+    files = ["src/ui/Button.tsx", "app/migrations/0001_init.sql", "lib/auth/jwt.go"]
+    assert classify_tags_from_files(files) == [
+        "authentication", "backend", "security", "sql", "ui",
+    ]
+
+
+def test_classify_tags_from_files_is_case_insensitive():
+    assert classify_tags_from_files(["src/UserDao.JAVA"]) == ["backend", "sql"]
+
+
+def test_classify_tags_from_files_empty():
+    assert classify_tags_from_files([]) == []
+    assert classify_tags_from_files(["README"]) == []